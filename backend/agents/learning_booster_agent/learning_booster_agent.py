@@ -1,15 +1,26 @@
-from typing import List, Dict, Any
-from openai import OpenAI
-import os
-import json
+from typing import List, Dict, Any, Optional
+from backend.rag.core.llm_gateway import llm_gateway
+from backend.rag.services.agent_artifact_cache import agent_artifact_cache
+from backend.rag.services.chapter_context_service import chapter_context_service
+from backend.rag.services.classification_cache import normalize_background
 
 
 class LearningBoosterAgent:
-    def __init__(self):
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    """Learning aids for a chapter
 
-    def generate_learning_boosters(self, chapter_content: str, user_background: str = "intermediate") -> Dict[str, Any]:
+    Every method takes the chapter content or a chapter id. With a chapter id, a diverse chunk
+    set within token_budget (default AGENT_CONTEXT_TOKENS) is sent from the vector index instead
+    of the whole chapter; the content is then only a fallback for unindexed chapters.
+    """
+
+    # Bump when a prompt changes so cached boosters are regenerated
+    PROMPT_VERSION = "1"
+
+    async def generate_learning_boosters(self, chapter_content: Optional[str] = None, user_background: str = "intermediate",
+                                         chapter_id: Optional[str] = None,
+                                         token_budget: Optional[int] = None) -> Dict[str, Any]:
         """Generate learning boosters based on chapter content and user background"""
+        chapter_content = await chapter_context_service.resolve_content(chapter_content, chapter_id, token_budget)
         booster_prompt = f"""
         Generate learning boosters for the following chapter content based on the user's background level.
 
@@ -24,17 +35,18 @@ class LearningBoosterAgent:
         - reflection_questions: Array of questions to promote deeper thinking
         """
 
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": booster_prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=1200
+        return await agent_artifact_cache.get_or_generate(
+            "learning_boosters", self.PROMPT_VERSION, {"background": normalize_background(user_background)},
+            chapter_content,
+            lambda: llm_gateway.chat_json([{"role": "user", "content": booster_prompt}], max_tokens=1200),
+            chapter_id
         )
 
-        return json.loads(response.choices[0].message.content)
-
-    def generate_practice_exercises(self, chapter_content: str, difficulty: str = "medium") -> List[str]:
+    async def generate_practice_exercises(self, chapter_content: Optional[str] = None, difficulty: str = "medium",
+                                          chapter_id: Optional[str] = None,
+                                          token_budget: Optional[int] = None) -> List[str]:
         """Generate practice exercises based on chapter content"""
+        chapter_content = await chapter_context_service.resolve_content(chapter_content, chapter_id, token_budget)
         exercise_prompt = f"""
         Generate 5 practice exercises based on the following chapter content.
         Difficulty level: {difficulty}
@@ -44,18 +56,18 @@ class LearningBoosterAgent:
         Return as an array of exercise descriptions.
         """
 
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": exercise_prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=800
+        result = await agent_artifact_cache.get_or_generate(
+            "practice_exercises", self.PROMPT_VERSION, {"difficulty": difficulty}, chapter_content,
+            lambda: llm_gateway.chat_json([{"role": "user", "content": exercise_prompt}], max_tokens=800),
+            chapter_id
         )
 
-        result = json.loads(response.choices[0].message.content)
         return result.get("exercises", [])
 
-    def generate_key_terms_summary(self, chapter_content: str) -> Dict[str, str]:
+    async def generate_key_terms_summary(self, chapter_content: Optional[str] = None, chapter_id: Optional[str] = None,
+                                         token_budget: Optional[int] = None) -> Dict[str, str]:
         """Generate a summary of key terms with definitions"""
+        chapter_content = await chapter_context_service.resolve_content(chapter_content, chapter_id, token_budget)
         terms_prompt = f"""
         Extract and define the 10 most important terms from the following chapter content.
 
@@ -64,15 +76,12 @@ class LearningBoosterAgent:
         Return as a JSON object with terms as keys and definitions as values.
         """
 
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": terms_prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=800
+        return await agent_artifact_cache.get_or_generate(
+            "key_terms", self.PROMPT_VERSION, {}, chapter_content,
+            lambda: llm_gateway.chat_json([{"role": "user", "content": terms_prompt}], max_tokens=800),
+            chapter_id
         )
 
-        return json.loads(response.choices[0].message.content)
-
 
 # Global instance
 learning_booster_agent = LearningBoosterAgent()
\ No newline at end of file
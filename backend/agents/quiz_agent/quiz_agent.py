@@ -1,16 +1,22 @@
-from typing import List
-from openai import OpenAI
-import os
-import json
+from typing import List, Optional
 from backend.shared.types import QuizQuestion, QuizResponse
+from backend.rag.core.llm_gateway import llm_gateway
+from backend.rag.services.agent_artifact_cache import agent_artifact_cache
+from backend.rag.services.chapter_context_service import chapter_context_service
 
 
 class QuizAgent:
-    def __init__(self):
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    # Bump when the prompt changes so cached quizzes are regenerated
+    PROMPT_VERSION = "1"
 
-    def generate_quiz(self, chapter_content: str, difficulty: str = "medium") -> QuizResponse:
-        """Generate quiz questions based on chapter content"""
+    async def generate_quiz(self, chapter_content: Optional[str] = None, difficulty: str = "medium",
+                            chapter_id: Optional[str] = None, token_budget: Optional[int] = None) -> QuizResponse:
+        """Generate quiz questions based on chapter content, cached per content and difficulty
+
+        With a chapter id, the prompt gets a diverse chunk set from the vector index within
+        token_budget (default AGENT_CONTEXT_TOKENS) instead of the whole chapter.
+        """
+        chapter_content = await chapter_context_service.resolve_content(chapter_content, chapter_id, token_budget)
         quiz_prompt = f"""
         Generate 5 multiple-choice questions based on the following chapter content.
         Difficulty level: {difficulty}
@@ -19,15 +25,12 @@ class QuizAgent:
         Chapter content: {chapter_content}
         """
 
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": quiz_prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=1500
+        questions_data = await agent_artifact_cache.get_or_generate(
+            "quiz", self.PROMPT_VERSION, {"difficulty": difficulty}, chapter_content,
+            lambda: llm_gateway.chat_json([{"role": "user", "content": quiz_prompt}], max_tokens=1500),
+            chapter_id
         )
 
-        questions_data = json.loads(response.choices[0].message.content)
-
         # Convert to QuizQuestion objects
         questions = []
         for q_data in questions_data:
@@ -1,16 +1,53 @@
-from typing import Dict, List
-from openai import OpenAI
-import os
+from typing import Any, Dict, Optional
+import asyncio
 import json
 from backend.shared.types import SummaryResponse
+from backend.rag.core.config import settings
+from backend.rag.core.llm_gateway import llm_gateway
+from backend.rag.services.agent_artifact_cache import agent_artifact_cache
+from backend.rag.services.embedding_service import embedding_service
 
 
 class SummaryAgent:
+    # Bump when a prompt changes so cached summaries are regenerated
+    PROMPT_VERSION = "1"
+
     def __init__(self):
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self._content_processor = None
+
+    @property
+    def content_processor(self):
+        # Imported lazily: ContentProcessor builds its own RAGService
+        if self._content_processor is None:
+            from backend.rag.services.content_processor import ContentProcessor
+            self._content_processor = ContentProcessor()
+        return self._content_processor
+
+    async def generate_summary(self, chapter_content: str, chapter_id: Optional[str] = None) -> SummaryResponse:
+        """Generate chapter summary with key points, cached per chapter content
+
+        Chapters longer than SUMMARY_MAP_REDUCE_TOKENS are summarized section by section
+        and the section summaries are then combined.
+        """
+        result = await agent_artifact_cache.get_or_generate(
+            "summary", self.PROMPT_VERSION, {}, chapter_content,
+            lambda: self._summarize(chapter_content),
+            chapter_id
+        )
+
+        return SummaryResponse(
+            summary=result.get("summary", ""),
+            key_points=result.get("key_points", []),
+            main_concepts=result.get("main_concepts", []),
+            takeaways=result.get("takeaways", [])
+        )
+
+    async def _summarize(self, chapter_content: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        tokens = await loop.run_in_executor(None, embedding_service.count_tokens, chapter_content)
+        if tokens > settings.SUMMARY_MAP_REDUCE_TOKENS:
+            return await self._map_reduce(chapter_content)
 
-    def generate_summary(self, chapter_content: str) -> SummaryResponse:
-        """Generate chapter summary with key points"""
         summary_prompt = f"""
         Create a concise summary of the following chapter content.
         Include 3-5 key points, main concepts, and important takeaways.
@@ -19,18 +56,47 @@ class SummaryAgent:
         Chapter content: {chapter_content}
         """
 
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": summary_prompt}],
-            response_format={"type": "json_object"},
-            max_tokens=1000
+        return await llm_gateway.chat_json([{"role": "user", "content": summary_prompt}], max_tokens=1000)
+
+    async def _map_reduce(self, chapter_content: str) -> Dict[str, Any]:
+        """Summarize sections concurrently, then combine them into one chapter summary"""
+        loop = asyncio.get_running_loop()
+        chunks = await loop.run_in_executor(
+            None,
+            lambda: self.content_processor.chunk_textbook_content(
+                chapter_content, "", settings.SUMMARY_SECTION_TOKENS, 0
+            )
         )
+        sections = [
+            f"{chunk['heading_hierarchy']}\n\n{chunk['text']}" if chunk['heading_hierarchy'] else chunk['text']
+            for chunk in chunks
+        ]
 
-        result = json.loads(response.choices[0].message.content)
+        # Wall-clock time follows the slowest section; the gateway bounds concurrency
+        section_summaries = await asyncio.gather(*(self._summarize_section(section) for section in sections))
 
-        return SummaryResponse(
-            summary=result.get("summary", ""),
-            key_points=result.get("key_points", []),
-            main_concepts=result.get("main_concepts", []),
-            takeaways=result.get("takeaways", [])
-        )
\ No newline at end of file
+        reduce_prompt = f"""
+        Combine the following section summaries of one textbook chapter into a single chapter summary.
+        Include 3-5 key points, main concepts, and important takeaways.
+        Format as JSON with fields: summary, key_points, main_concepts, takeaways
+
+        Section summaries: {json.dumps(section_summaries, ensure_ascii=False)}
+        """
+
+        return await llm_gateway.chat_json([{"role": "user", "content": reduce_prompt}], max_tokens=1000)
+
+    async def _summarize_section(self, section: str) -> Dict[str, Any]:
+        """Summary of one section, cached by its own content so edits elsewhere in the chapter reuse it"""
+        section_prompt = f"""
+        Summarize the following section of a textbook chapter in 2-3 sentences and list its key points.
+        Format as JSON with fields: summary, key_points
+
+        Section content: {section}
+        """
+
+        # Not tied to a chapter id: unchanged sections must survive edits to the rest of the chapter
+        result = await agent_artifact_cache.get_or_generate(
+            "summary_section", self.PROMPT_VERSION, {}, section,
+            lambda: llm_gateway.chat_json([{"role": "user", "content": section_prompt}], max_tokens=400)
+        )
+        return {"summary": result.get("summary", ""), "key_points": result.get("key_points", [])}
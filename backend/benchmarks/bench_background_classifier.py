@@ -0,0 +1,114 @@
+"""
+Compare the local prototype classifier with the LLM classifier on a labeled sample of backgrounds:
+accuracy, coverage (share answered without the LLM) and latency
+"""
+import argparse
+import json
+import time
+from typing import List, Tuple
+
+from backend.rag.core.config import settings
+from backend.rag.services.background_prototypes import prototype_classifier
+
+# Held-out labeled backgrounds, distinct from the prototype examples
+SAMPLES: List[Tuple[str, str]] = [
+    ("Middle school teacher with no coding experience who wants to explain robots to kids", "beginner_student"),
+    ("I just finished high school and I'm fascinated by AI", "beginner_student"),
+    ("Artist with zero technical knowledge, curious about humanoids", "beginner_student"),
+    ("Business student, never programmed anything", "beginner_student"),
+    ("Retired accountant exploring new technology as a hobby", "beginner_student"),
+    ("I did a couple of Python courses online and trained an MNIST classifier", "intermediate_learner"),
+    ("Third year CS undergraduate who took a robotics elective", "intermediate_learner"),
+    ("Web developer who has experimented with OpenCV on weekends", "intermediate_learner"),
+    ("Mechanical engineering student familiar with MATLAB and basic kinematics", "intermediate_learner"),
+    ("Data analyst learning deep learning through Kaggle competitions", "intermediate_learner"),
+    ("Five years building warehouse robots with ROS 2 and Gazebo", "advanced_practitioner"),
+    ("Staff engineer responsible for the motion control stack of an industrial arm", "advanced_practitioner"),
+    ("I deploy real-time perception pipelines on Jetson hardware for a startup", "advanced_practitioner"),
+    ("Autonomous vehicle software engineer working on sensor fusion", "advanced_practitioner"),
+    ("Firmware developer for servo drives and humanoid actuators", "advanced_practitioner"),
+    ("Doctoral candidate studying sim-to-real transfer for quadrupeds", "researcher_academic"),
+    ("Associate professor of mechanical engineering publishing on bipedal walking", "researcher_academic"),
+    ("Research fellow working on vision-language-action models", "researcher_academic"),
+    ("Master's student doing a thesis on tactile sensing for dexterous hands", "researcher_academic"),
+    ("Scientist at a national lab researching multi-robot coordination", "researcher_academic"),
+]
+
+
+def load_samples(path: str) -> List[Tuple[str, str]]:
+    """Read JSON lines of {"background": ..., "audience_type": ...}"""
+    samples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                samples.append((entry["background"], entry["audience_type"]))
+    return samples
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", help="JSON lines file of labeled backgrounds (default: built-in sample)")
+    parser.add_argument("--llm", action="store_true", help="Also classify every sample with the LLM (uses the OpenAI API)")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples) if args.samples else SAMPLES
+    # Embed the prototypes before timing
+    prototype_classifier.centroids
+
+    nearest_correct = 0
+    answered = 0
+    answered_correct = 0
+    latencies = []
+    for background, label in samples:
+        # One embedding per background, as in classify(); the decision on the scores is not timed
+        start = time.perf_counter()
+        scores = prototype_classifier.score(background)
+        latencies.append(time.perf_counter() - start)
+        classification = prototype_classifier.classify_scores(scores)
+
+        nearest = max(scores, key=scores.get)
+        nearest_correct += nearest == label
+        if classification is not None:
+            answered += 1
+            answered_correct += classification["audience_type"] == label
+
+    total = len(samples)
+    print(
+        f"samples={total} min_similarity={settings.LOCAL_CLASSIFIER_MIN_SIMILARITY} "
+        f"min_margin={settings.LOCAL_CLASSIFIER_MIN_MARGIN}"
+    )
+    print(f"local nearest centroid accuracy: {nearest_correct / total:.1%}")
+    print(
+        f"local above threshold: coverage {answered / total:.1%}, "
+        f"accuracy {answered_correct / max(answered, 1):.1%}"
+    )
+    print(f"local latency: p50 {percentile(latencies, 0.5) * 1000:.1f}ms  p95 {percentile(latencies, 0.95) * 1000:.1f}ms")
+
+    if args.llm:
+        from backend.rag.core.llm_gateway import llm_gateway
+        from backend.rag.services.personalization_service import BackgroundClassifier
+        classifier = BackgroundClassifier()
+
+        llm_correct = 0
+        llm_latencies = []
+        for background, label in samples:
+            start = time.perf_counter()
+            classification = llm_gateway.chat_json_sync(classifier._classification_messages(background))
+            llm_latencies.append(time.perf_counter() - start)
+            llm_correct += classification.get("audience_type") == label
+
+        print(f"LLM accuracy: {llm_correct / total:.1%}")
+        print(
+            f"LLM latency: p50 {percentile(llm_latencies, 0.5) * 1000:.0f}ms  "
+            f"p95 {percentile(llm_latencies, 0.95) * 1000:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark HTTP and gRPC search latency against Qdrant under concurrent load
+"""
+import argparse
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+from backend.rag.core.config import settings
+from backend.rag.core.qdrant_client import QdrantSetup
+
+
+def _random_vector() -> List[float]:
+    return [random.uniform(-1.0, 1.0) for _ in range(settings.EMBEDDING_DIMENSION)]
+
+
+def run_benchmark(prefer_grpc: bool, requests: int, concurrency: int, limit: int) -> Dict[str, float]:
+    """Run concurrent searches over one shared client and collect latency statistics"""
+    setup = QdrantSetup(prefer_grpc=prefer_grpc)
+    query_vectors = [_random_vector() for _ in range(requests)]
+
+    # Warm up the connection pool before measuring
+    for query_vector in query_vectors[:concurrency]:
+        setup.search_chunks(query_vector, limit)
+
+    def timed_search(query_vector: List[float]) -> float:
+        start = time.perf_counter()
+        setup.search_chunks(query_vector, limit)
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(timed_search, query_vectors))
+    wall_time = time.perf_counter() - wall_start
+
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "throughput_qps": requests / wall_time
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=settings.QDRANT_POOL_SIZE)
+    parser.add_argument("--limit", type=int, default=settings.TOP_K)
+    args = parser.parse_args()
+
+    for transport, prefer_grpc in (("http", False), ("grpc", True)):
+        result = run_benchmark(prefer_grpc, args.requests, args.concurrency, args.limit)
+        print(
+            f"{transport:>5}: p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms "
+            f"p99={result['p99_ms']:.2f}ms throughput={result['throughput_qps']:.1f} qps"
+        )
+
+
+if __name__ == "__main__":
+    main()
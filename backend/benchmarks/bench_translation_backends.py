@@ -0,0 +1,176 @@
+"""
+Compare an int8 translation backend (CTranslate2 or ONNX Runtime) with the torch pipeline:
+load memory, translation latency and BLEU drift of the int8 output against the torch output
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import List
+
+# Keep the benchmark from reading or seeding the real translation memory
+os.environ["TRANSLATION_MEMORY_PATH"] = os.path.join(tempfile.mkdtemp(), "translation_memory.sqlite3")
+
+from backend.rag.core.config import settings
+from backend.rag.services.translation_backends import load_translator, TORCH, CTRANSLATE2, ONNX
+
+
+def rss_mb() -> float:
+    """Current resident set size, falling back to the peak where /proc is unavailable"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def corpus_bleu(hypotheses: List[str], references: List[str], max_order: int = 4) -> float:
+    """Whitespace-tokenized corpus BLEU with brevity penalty (sacrebleu is used when installed)"""
+    try:
+        import sacrebleu
+        return sacrebleu.corpus_bleu(hypotheses, [references]).score
+    except ImportError:
+        pass
+
+    matches = [0] * max_order
+    totals = [0] * max_order
+    hypothesis_length = reference_length = 0
+    for hypothesis, reference in zip(hypotheses, references):
+        hypothesis_tokens = hypothesis.split()
+        reference_tokens = reference.split()
+        hypothesis_length += len(hypothesis_tokens)
+        reference_length += len(reference_tokens)
+        for n in range(1, max_order + 1):
+            hypothesis_ngrams = Counter(tuple(hypothesis_tokens[i:i + n]) for i in range(len(hypothesis_tokens) - n + 1))
+            reference_ngrams = Counter(tuple(reference_tokens[i:i + n]) for i in range(len(reference_tokens) - n + 1))
+            matches[n - 1] += sum((hypothesis_ngrams & reference_ngrams).values())
+            totals[n - 1] += max(len(hypothesis_tokens) - n + 1, 0)
+
+    if min(matches) == 0:
+        return 0.0
+    log_precision = sum(math.log(m / t) for m, t in zip(matches, totals)) / max_order
+    brevity = 1.0 if hypothesis_length > reference_length else math.exp(1 - reference_length / max(hypothesis_length, 1))
+    return 100 * brevity * math.exp(log_precision)
+
+
+def load_segments(paths: List[str], limit: int) -> List[str]:
+    if paths:
+        chapters = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                chapters.append(f.read())
+    else:
+        from backend.rag.services.chapter_service import chapter_service
+        chapters = [chapter.content for chapter in chapter_service.chapters]
+
+    # Imported here: measurements run in separate processes that never build the translation service
+    from backend.rag.services.translation_service import FormattingPreserver
+    preserver = FormattingPreserver()
+    segments = []
+    for chapter in chapters:
+        for block in preserver.parse_markdown(chapter):
+            if block['type'] in ('text', 'heading', 'list_item') and block['content'].strip():
+                segments.append(block['content'])
+    return segments[:limit]
+
+
+def run(backend: str, segments: List[str], batch_size: int):
+    before = rss_mb()
+    start = time.perf_counter()
+    translator, loaded = load_translator(backend)
+    load_seconds = time.perf_counter() - start
+    if translator is None or loaded != backend:
+        raise SystemExit(f"Could not load the {backend} backend")
+    memory = rss_mb() - before
+
+    # Warm-up batch, excluded from the latency figures
+    translator(segments[:batch_size], batch_size=batch_size, max_length=settings.TRANSLATION_MAX_OUTPUT_TOKENS)
+
+    outputs = []
+    latencies = []
+    for start_index in range(0, len(segments), batch_size):
+        batch = segments[start_index:start_index + batch_size]
+        start = time.perf_counter()
+        results = translator(batch, batch_size=batch_size, max_length=settings.TRANSLATION_MAX_OUTPUT_TOKENS)
+        latencies.append(time.perf_counter() - start)
+        outputs.extend(result['translation_text'] for result in results)
+
+    latencies.sort()
+    total = sum(latencies)
+    print(
+        f"{backend:12s} load {load_seconds:6.1f}s  +{memory:7.0f} MB RSS  "
+        f"total {total:6.2f}s  {len(segments) / total:6.1f} segments/s  "
+        f"p50 batch {latencies[len(latencies) // 2] * 1000:7.0f}ms  "
+        f"p95 batch {latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] * 1000:7.0f}ms"
+    )
+    return outputs
+
+
+def measure(backend: str, segments: List[str], batch_size: int) -> List[str]:
+    """Run one backend in a fresh interpreter, so every load memory figure starts from the same baseline"""
+    with tempfile.TemporaryDirectory() as directory:
+        segments_path = os.path.join(directory, "segments.json")
+        outputs_path = os.path.join(directory, "outputs.json")
+        with open(segments_path, "w", encoding="utf-8") as f:
+            json.dump(segments, f)
+        subprocess.run(
+            [
+                sys.executable, "-m", "backend.benchmarks.bench_translation_backends",
+                "--measure", backend,
+                "--segments-file", segments_path,
+                "--outputs-file", outputs_path,
+                "--batch-size", str(batch_size),
+                "--model-dir", settings.TRANSLATION_MODEL_DIR,
+            ],
+            check=True
+        )
+        with open(outputs_path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("chapters", nargs="*", help="Markdown chapter files (default: built-in sample chapters)")
+    parser.add_argument("--backend", choices=[CTRANSLATE2, ONNX], default=CTRANSLATE2)
+    parser.add_argument("--model-dir", default=settings.TRANSLATION_MODEL_DIR, help="Converted int8 model directory")
+    parser.add_argument("--batch-size", type=int, default=settings.TRANSLATION_BATCH_SIZE)
+    parser.add_argument("--limit", type=int, default=200, help="Maximum number of segments to translate")
+    parser.add_argument("--measure", choices=[TORCH, CTRANSLATE2, ONNX], help=argparse.SUPPRESS)
+    parser.add_argument("--segments-file", help=argparse.SUPPRESS)
+    parser.add_argument("--outputs-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not args.model_dir:
+        raise SystemExit("Pass --model-dir or set TRANSLATION_MODEL_DIR")
+    settings.TRANSLATION_MODEL_DIR = args.model_dir
+
+    if args.measure:
+        with open(args.segments_file, encoding="utf-8") as f:
+            segments = json.load(f)
+        outputs = run(args.measure, segments, args.batch_size)
+        with open(args.outputs_file, "w", encoding="utf-8") as f:
+            json.dump(outputs, f)
+        return
+
+    segments = load_segments(args.chapters, args.limit)
+    print(f"segments={len(segments)} batch_size={args.batch_size} threads={settings.TRANSLATION_TORCH_THREADS}")
+
+    quantized = measure(args.backend, segments, args.batch_size)
+    reference = measure(TORCH, segments, args.batch_size)
+
+    identical = sum(1 for a, b in zip(quantized, reference) if a == b)
+    print(f"BLEU of {args.backend} against torch output: {corpus_bleu(quantized, reference):.1f}")
+    print(f"identical translations: {identical}/{len(segments)}")
+
+
+if __name__ == "__main__":
+    main()
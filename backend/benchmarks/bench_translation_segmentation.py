@@ -0,0 +1,87 @@
+"""
+Benchmark translation throughput and truncation rate: whole-line inputs versus
+sentence segmentation with length bucketing, on real chapters
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import List
+
+# Keep the benchmark from reading or seeding the real translation memory
+os.environ["TRANSLATION_MEMORY_PATH"] = os.path.join(tempfile.mkdtemp(), "translation_memory.sqlite3")
+
+from backend.rag.core.config import settings
+from backend.rag.services.translation_service import UrduTranslationService
+
+
+def load_chapters(paths: List[str]) -> List[str]:
+    if paths:
+        chapters = []
+        for path in paths:
+            with open(path, encoding="utf-8") as f:
+                chapters.append(f.read())
+        return chapters
+
+    from backend.rag.services.chapter_service import chapter_service
+    return [chapter.content for chapter in chapter_service.chapters]
+
+
+def translatable_lines(service: UrduTranslationService, chapters: List[str]) -> List[str]:
+    lines = []
+    for chapter in chapters:
+        for block in service.formatter_preserver.parse_markdown(chapter):
+            if block['type'] in ('text', 'heading', 'list_item') and block['content'].strip():
+                lines.append(block['content'])
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("chapters", nargs="*", help="Markdown chapter files (default: built-in sample chapters)")
+    args = parser.parse_args()
+
+    service = UrduTranslationService()
+    if service.translator is None:
+        raise SystemExit("Translation model could not be loaded")
+
+    lines = translatable_lines(service, load_chapters(args.chapters))
+    model_limit = service.translator.tokenizer.model_max_length
+    total_chars = sum(len(line) for line in lines)
+
+    # Baseline: whole lines, as translated before segmentation, batched like the segmented path
+    truncated = sum(1 for line in lines if service._count_tokens(line) + 1 > model_limit)
+    batch_size = settings.TRANSLATION_BATCH_SIZE
+    start = time.perf_counter()
+    for offset in range(0, len(lines), batch_size):
+        service.translator(
+            lines[offset:offset + batch_size],
+            batch_size=batch_size,
+            max_length=settings.TRANSLATION_MAX_OUTPUT_TOKENS,
+            truncation=True
+        )
+    baseline_seconds = time.perf_counter() - start
+
+    # Segmented and length-bucketed
+    segments = [segment for line in lines for segment in service.segment_text(line)]
+    segment_truncated = sum(1 for segment in segments if service._count_tokens(segment) + 1 > model_limit)
+    start = time.perf_counter()
+    service._translate_texts(lines)
+    segmented_seconds = time.perf_counter() - start
+
+    print(
+        f"lines={len(lines)} segments={len(segments)} chars={total_chars} "
+        f"model_limit={model_limit} batch_size={batch_size}"
+    )
+    print(
+        f"whole lines:     {baseline_seconds:.2f}s  {total_chars / baseline_seconds:.0f} chars/s  "
+        f"truncation rate {truncated / max(len(lines), 1):.1%}"
+    )
+    print(
+        f"segmented:       {segmented_seconds:.2f}s  {total_chars / segmented_seconds:.0f} chars/s  "
+        f"truncation rate {segment_truncated / max(len(segments), 1):.1%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
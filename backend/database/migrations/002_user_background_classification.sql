@@ -0,0 +1,5 @@
+-- Store the background classification on the user profile so personalization can skip re-classifying
+
+ALTER TABLE user_profiles ADD COLUMN audience_type VARCHAR(50);
+ALTER TABLE user_profiles ADD COLUMN complexity_level VARCHAR(20);
+ALTER TABLE user_profiles ADD COLUMN background_hash CHAR(64);
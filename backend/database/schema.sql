@@ -6,6 +6,9 @@ CREATE TABLE user_profiles (
     email VARCHAR(255) UNIQUE NOT NULL,
     name VARCHAR(255),
     background TEXT, -- User's educational/professional background
+    audience_type VARCHAR(50), -- Classification of the background
+    complexity_level VARCHAR(20),
+    background_hash CHAR(64), -- Hash of the normalized background the classification was made from
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW()
 );
@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from backend.rag.routes import chat, auth, translation, personalization, chapter_routes
+from backend.rag.routes import chat, auth, translation, personalization, chapter_routes, admin
 from backend.rag.core import logging_config
 
 app = FastAPI(title="Physical AI & Humanoid Robotics Textbook API")
@@ -20,6 +20,7 @@ app.include_router(auth.router)
 app.include_router(translation.router)
 app.include_router(personalization.router)
 app.include_router(chapter_routes.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def read_root():
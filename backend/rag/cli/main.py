@@ -0,0 +1,21 @@
+"""
+Main CLI entry point for vector collection and translation management
+"""
+import click
+from backend.rag.cli.vector_commands import vector
+from backend.rag.cli.translation_commands import translation
+
+
+@click.group()
+def cli():
+    """
+    Textbook backend management commands
+    """
+    pass
+
+
+cli.add_command(vector)
+cli.add_command(translation)
+
+if __name__ == '__main__':
+    cli()
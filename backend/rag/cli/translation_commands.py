@@ -0,0 +1,61 @@
+"""
+Translation memory CLI Commands
+"""
+import click
+from backend.rag.core.config import settings
+from backend.rag.services.translation_memory import translation_memory
+from backend.rag.core.logging_config import get_logger
+
+
+@click.group()
+def translation():
+    """
+    Translation memory commands
+    """
+    pass
+
+
+@translation.command()
+@click.option('--path', required=True, help='JSON lines file to write')
+@click.option('--model-id', default=None, help='Only export entries for this model (default: all models)')
+def export_memory(path: str, model_id: str):
+    """
+    Export the translation memory so it can be shipped with a release
+    """
+    logger = get_logger(__name__)
+    logger.info(f"Exporting translation memory to {path}")
+
+    try:
+        count = translation_memory.export_jsonl(path, model_id)
+
+        click.echo(f"✓ Translation memory exported successfully!")
+        click.echo(f"  Path: {path}")
+        click.echo(f"  Entries: {count}")
+
+    except Exception as e:
+        click.echo(f"✗ Error exporting translation memory: {str(e)}", err=True)
+
+
+@translation.command()
+@click.option('--path', required=True, help='JSON lines file to load')
+def import_memory(path: str):
+    """
+    Pre-seed the translation memory from an exported file
+    """
+    logger = get_logger(__name__)
+    logger.info(f"Importing translation memory from {path}")
+
+    try:
+        count = translation_memory.import_jsonl(path)
+
+        click.echo(f"✓ Translation memory imported successfully!")
+        click.echo(f"  Path: {path}")
+        click.echo(f"  Entries: {count}")
+        click.echo(f"  Store: {settings.TRANSLATION_MEMORY_PATH}")
+
+    except Exception as e:
+        click.echo(f"✗ Error importing translation memory: {str(e)}", err=True)
+
+
+if __name__ == '__main__':
+    translation()
@@ -0,0 +1,126 @@
+"""
+Vector collection CLI Commands
+"""
+import click
+from backend.rag.core.config import settings
+from backend.rag.core.qdrant_client import qdrant_setup
+from backend.rag.services.snapshot_service import snapshot_service
+from backend.rag.core.logging_config import get_logger
+
+
+def _format_bytes(num_bytes: int) -> str:
+    """
+    Format a byte count for display
+    """
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+def _echo_memory(label: str, memory: dict):
+    """
+    Print a memory usage report
+    """
+    click.echo(f"  {label}:")
+    click.echo(f"    Points: {memory['points_count']}")
+    click.echo(f"    Original vectors: {_format_bytes(memory['original_vectors_bytes'])}")
+    click.echo(f"    Quantized vectors: {_format_bytes(memory['quantized_vectors_bytes'])}")
+    click.echo(f"    HNSW graph: {_format_bytes(memory['hnsw_graph_bytes'])}")
+    click.echo(f"    Estimated RAM: {_format_bytes(memory['estimated_ram_bytes'])}")
+
+
+@click.group()
+def vector():
+    """
+    Vector collection commands
+    """
+    pass
+
+
+@vector.command()
+@click.option('--k', default=10, help='Number of neighbours used for recall@k (default: 10)')
+@click.option('--sample-size', default=100, help='Number of stored vectors used as evaluation queries (default: 100)')
+@click.option('--timeout', default=600.0, help='Seconds to wait for re-indexing to finish (default: 600)')
+def migrate_collection(k: int, sample_size: int, timeout: float):
+    """
+    Rebuild the collection with the configured quantization, on-disk and HNSW settings
+    """
+    logger = get_logger(__name__)
+    logger.info(f"Migrating collection: {settings.QDRANT_COLLECTION_NAME}")
+
+    try:
+        query_vectors = qdrant_setup.sample_vectors(sample_size)
+
+        memory_before = qdrant_setup.estimate_memory_usage()
+        recall_before = qdrant_setup.measure_recall(query_vectors, k)
+
+        qdrant_setup.update_collection_settings()
+        if not qdrant_setup.wait_for_green_status(timeout=timeout):
+            click.echo(f"✗ Collection did not finish re-indexing within {timeout} seconds", err=True)
+            return
+
+        memory_after = qdrant_setup.estimate_memory_usage()
+        recall_after = qdrant_setup.measure_recall(query_vectors, k)
+
+        click.echo(f"✓ Collection migrated successfully!")
+        click.echo(f"  Collection: {settings.QDRANT_COLLECTION_NAME}")
+        click.echo(f"  Quantization: {settings.QDRANT_QUANTIZATION}")
+        click.echo(f"  On-disk originals: {settings.QDRANT_ON_DISK}")
+        click.echo(f"  HNSW m / ef_construct: {settings.QDRANT_HNSW_M} / {settings.QDRANT_HNSW_EF_CONSTRUCT}")
+        _echo_memory("Before", memory_before)
+        _echo_memory("After", memory_after)
+        click.echo(f"  Recall@{k} before: {recall_before:.4f}")
+        click.echo(f"  Recall@{k} after: {recall_after:.4f}")
+
+    except Exception as e:
+        click.echo(f"✗ Error migrating collection: {str(e)}", err=True)
+
+
+@vector.command()
+@click.option('--path', default=settings.VECTOR_SNAPSHOT_PATH, help='Snapshot file to write')
+def export_snapshot(path: str):
+    """
+    Export the collection to a portable snapshot file
+    """
+    logger = get_logger(__name__)
+    logger.info(f"Exporting collection {settings.QDRANT_COLLECTION_NAME} to {path}")
+
+    try:
+        result = snapshot_service.export_snapshot(path)
+
+        click.echo(f"✓ Snapshot exported successfully!")
+        click.echo(f"  Path: {result['path']}")
+        click.echo(f"  Vectors: {result['count']}")
+        click.echo(f"  Size: {_format_bytes(result['bytes'])}")
+
+    except Exception as e:
+        click.echo(f"✗ Error exporting snapshot: {str(e)}", err=True)
+
+
+@vector.command()
+@click.option('--path', default=settings.VECTOR_SNAPSHOT_PATH, help='Snapshot file to restore')
+@click.option('--batch-size', default=256, help='Points per upload batch (default: 256)')
+@click.option('--force', is_flag=True, help='Restore even if the embedding model does not match')
+def import_snapshot(path: str, batch_size: int, force: bool):
+    """
+    Restore a snapshot file into the collection
+    """
+    logger = get_logger(__name__)
+    logger.info(f"Importing snapshot {path} into {settings.QDRANT_COLLECTION_NAME}")
+
+    try:
+        result = snapshot_service.import_snapshot(path, force=force, batch_size=batch_size)
+
+        click.echo(f"✓ Snapshot imported successfully!")
+        click.echo(f"  Collection: {settings.QDRANT_COLLECTION_NAME}")
+        click.echo(f"  Vectors: {result['count']}")
+        click.echo(f"  Embedding model: {result['embedding_model']}")
+
+    except Exception as e:
+        click.echo(f"✗ Error importing snapshot: {str(e)}", err=True)
+
+
+if __name__ == '__main__':
+    vector()
@@ -11,16 +11,105 @@ class Settings:
     QDRANT_API_KEY: Optional[str] = os.getenv("QDRANT_API_KEY")
     QDRANT_COLLECTION_NAME: str = os.getenv("QDRANT_COLLECTION_NAME", "textbook_chunks")
 
+    # Qdrant transport settings
+    QDRANT_PREFER_GRPC: bool = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
+    QDRANT_GRPC_PORT: int = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    QDRANT_TIMEOUT: int = int(os.getenv("QDRANT_TIMEOUT", "10"))  # seconds
+    QDRANT_POOL_SIZE: int = int(os.getenv("QDRANT_POOL_SIZE", "32"))  # sized for worker concurrency
+
+    # Qdrant collection storage settings
+    QDRANT_QUANTIZATION: str = os.getenv("QDRANT_QUANTIZATION", "none")  # none, scalar or binary
+    QDRANT_QUANTIZATION_ALWAYS_RAM: bool = os.getenv("QDRANT_QUANTIZATION_ALWAYS_RAM", "true").lower() == "true"
+    QDRANT_ON_DISK: bool = os.getenv("QDRANT_ON_DISK", "false").lower() == "true"
+    QDRANT_HNSW_M: int = int(os.getenv("QDRANT_HNSW_M", "16"))
+    QDRANT_HNSW_EF_CONSTRUCT: int = int(os.getenv("QDRANT_HNSW_EF_CONSTRUCT", "100"))
+
+    # Qdrant search settings
+    QDRANT_SEARCH_HNSW_EF: Optional[int] = int(os.getenv("QDRANT_SEARCH_HNSW_EF")) if os.getenv("QDRANT_SEARCH_HNSW_EF") else None
+    QDRANT_SEARCH_OVERSAMPLING: float = float(os.getenv("QDRANT_SEARCH_OVERSAMPLING", "2.0"))
+    QDRANT_SEARCH_RESCORE: bool = os.getenv("QDRANT_SEARCH_RESCORE", "true").lower() == "true"
+
     # OpenAI settings
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
 
+    # LLM gateway settings
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "openai")  # openai or stub
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-4")
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # in-flight calls across all models
+    LLM_MODEL_CONCURRENCY: str = os.getenv("LLM_MODEL_CONCURRENCY", "")  # per model, e.g. "gpt-4=8,gpt-4o-mini=32"
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", "60"))  # seconds per attempt
+    LLM_DEADLINE: float = float(os.getenv("LLM_DEADLINE", "300"))  # seconds per call: queue wait, attempts and backoff
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+    LLM_HTTP2: bool = os.getenv("LLM_HTTP2", "true").lower() == "true"
+    LLM_POOL_SIZE: int = int(os.getenv("LLM_POOL_SIZE", "32"))
+    LLM_RPM_LIMIT: int = int(os.getenv("LLM_RPM_LIMIT", "0"))  # requests per minute, 0 for unlimited
+    LLM_TPM_LIMIT: int = int(os.getenv("LLM_TPM_LIMIT", "0"))  # tokens per minute, 0 for unlimited
+    LLM_PRIORITY_WEIGHTS: str = os.getenv("LLM_PRIORITY_WEIGHTS", "interactive=8,personalization=3,batch=1")
+    LLM_BATCH_RESERVE: float = float(os.getenv("LLM_BATCH_RESERVE", "0.2"))  # budget share batch calls may not use
+    LLM_DEFAULT_MAX_TOKENS: int = int(os.getenv("LLM_DEFAULT_MAX_TOKENS", "500"))  # completion estimate without max_tokens
+
     # Embedding model settings
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
     EMBEDDING_DIMENSION: int = 384  # For MiniLM model
+    EMBEDDING_MODEL_VERSION: str = os.getenv("EMBEDDING_MODEL_VERSION", "1")
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+
+    # Chunking settings, in embedding model tokens
+    CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", "256"))  # MiniLM's max sequence length
+    CHUNK_OVERLAP_TOKENS: int = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+
+    # Vector backend settings
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "qdrant")  # qdrant or local
+    VECTOR_SNAPSHOT_PATH: str = os.getenv("VECTOR_SNAPSHOT_PATH", "snapshots/textbook_chunks.vsnap")
+
+    # Translation settings
+    TRANSLATION_MODEL: str = os.getenv("TRANSLATION_MODEL", "Helsinki-NLP/opus-mt-en-ur")
+    TRANSLATION_BACKEND: str = os.getenv("TRANSLATION_BACKEND", "torch")  # torch, ctranslate2 or onnx
+    TRANSLATION_MODEL_DIR: str = os.getenv("TRANSLATION_MODEL_DIR", "")  # converted int8 model for ctranslate2/onnx
+    TRANSLATION_BEAM_SIZE: int = int(os.getenv("TRANSLATION_BEAM_SIZE", "4"))  # Opus-MT generation default
+    TRANSLATION_BATCH_SIZE: int = int(os.getenv("TRANSLATION_BATCH_SIZE", "16"))
+    TRANSLATION_MAX_INPUT_TOKENS: int = int(os.getenv("TRANSLATION_MAX_INPUT_TOKENS", "400"))  # per segment
+    TRANSLATION_MAX_OUTPUT_TOKENS: int = int(os.getenv("TRANSLATION_MAX_OUTPUT_TOKENS", "512"))  # Opus-MT limit
+    TRANSLATION_MEMORY_PATH: str = os.getenv("TRANSLATION_MEMORY_PATH", "data/translation_memory.sqlite3")
+    TRANSLATION_MEMORY_LRU_SIZE: int = int(os.getenv("TRANSLATION_MEMORY_LRU_SIZE", "10000"))
+    CHAPTER_SECTION_CACHE_SIZE: int = int(os.getenv("CHAPTER_SECTION_CACHE_SIZE", "512"))  # translated sections kept in memory
+    TRANSLATION_WORKERS: int = int(os.getenv("TRANSLATION_WORKERS", "1"))
+    TRANSLATION_MAX_QUEUE: int = int(os.getenv("TRANSLATION_MAX_QUEUE", "8"))  # waiting requests before 429
+    TRANSLATION_TIMEOUT: float = float(os.getenv("TRANSLATION_TIMEOUT", "120"))  # seconds per request
+    # Process-wide torch intra-op threads (and CTranslate2 threads), set once when the model loads
+    TRANSLATION_TORCH_THREADS: int = int(os.getenv("TRANSLATION_TORCH_THREADS", str(max((os.cpu_count() or 1) // 2, 1))))
+
+    # Personalization settings
+    CLASSIFICATION_CACHE_PATH: str = os.getenv("CLASSIFICATION_CACHE_PATH", "data/background_classifications.sqlite3")
+    CLASSIFICATION_CACHE_LRU_SIZE: int = int(os.getenv("CLASSIFICATION_CACHE_LRU_SIZE", "4096"))
+
+    PERSONALIZATION_VARIANT_PATH: str = os.getenv("PERSONALIZATION_VARIANT_PATH", "data/personalized_variants.sqlite3")
+    PERSONALIZATION_WORKERS: int = int(os.getenv("PERSONALIZATION_WORKERS", "1"))
+    PERSONALIZATION_BATCH_CONCURRENCY: int = int(os.getenv("PERSONALIZATION_BATCH_CONCURRENCY", "8"))
+    PERSONALIZATION_BATCH_MAX_ITEMS: int = int(os.getenv("PERSONALIZATION_BATCH_MAX_ITEMS", "50"))
+    LOCAL_CLASSIFIER_ENABLED: bool = os.getenv("LOCAL_CLASSIFIER_ENABLED", "true").lower() == "true"
+    LOCAL_CLASSIFIER_MIN_SIMILARITY: float = float(os.getenv("LOCAL_CLASSIFIER_MIN_SIMILARITY", "0.3"))
+    LOCAL_CLASSIFIER_MIN_MARGIN: float = float(os.getenv("LOCAL_CLASSIFIER_MIN_MARGIN", "0.03"))  # over the runner-up
+
+    # Agent settings
+    AGENT_CACHE_PATH: str = os.getenv("AGENT_CACHE_PATH", "data/agent_artifacts.sqlite3")
+    AGENT_CACHE_LRU_SIZE: int = int(os.getenv("AGENT_CACHE_LRU_SIZE", "256"))
+    AGENT_CACHE_MAX_UNBOUND: int = int(os.getenv("AGENT_CACHE_MAX_UNBOUND", "5000"))  # entries without a chapter id, e.g. section summaries
+    AGENT_CONTEXT_TOKENS: int = int(os.getenv("AGENT_CONTEXT_TOKENS", "1500"))  # default budget for retrieved agent context
+    AGENT_MMR_LAMBDA: float = float(os.getenv("AGENT_MMR_LAMBDA", "0.5"))  # 1.0 favours coverage, 0.0 diversity
+    SUMMARY_MAP_REDUCE_TOKENS: int = int(os.getenv("SUMMARY_MAP_REDUCE_TOKENS", "3000"))  # longer chapters are map-reduced
+    SUMMARY_SECTION_TOKENS: int = int(os.getenv("SUMMARY_SECTION_TOKENS", "1500"))  # max tokens per mapped section
 
     # RAG settings
     TOP_K: int = int(os.getenv("TOP_K", "6"))
     SCORE_THRESHOLD: float = float(os.getenv("SCORE_THRESHOLD", "0.3"))
 
+    # Multi-query retrieval settings
+    MULTI_QUERY_RETRIEVAL: bool = os.getenv("MULTI_QUERY_RETRIEVAL", "false").lower() == "true"
+    MULTI_QUERY_MAX_SUBQUERIES: int = int(os.getenv("MULTI_QUERY_MAX_SUBQUERIES", "4"))
+    RRF_K: int = int(os.getenv("RRF_K", "60"))  # reciprocal rank fusion constant
+
 
 settings = Settings()
\ No newline at end of file
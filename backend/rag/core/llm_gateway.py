@@ -0,0 +1,233 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+import asyncio
+import concurrent.futures
+import json
+import random
+import threading
+import httpx
+from backend.rag.core.config import settings
+from backend.rag.core.llm_scheduler import LLMScheduler, BATCH
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMResult(NamedTuple):
+    content: str
+    total_tokens: int
+
+
+class OpenAIBackend:
+    """Chat completions over one pooled (HTTP/2 where available) AsyncOpenAI client"""
+
+    def __init__(self):
+        self._client = None
+
+    @property
+    def client(self):
+        # Created on the gateway loop, so the connection pool lives there
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            http2 = settings.LLM_HTTP2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("h2 is not installed, LLM gateway falls back to HTTP/1.1")
+                    http2 = False
+
+            self._client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                # Retries and timeouts are owned by the gateway
+                max_retries=0,
+                http_client=httpx.AsyncClient(
+                    http2=http2,
+                    timeout=settings.LLM_TIMEOUT,
+                    limits=httpx.Limits(
+                        max_connections=settings.LLM_POOL_SIZE,
+                        max_keepalive_connections=settings.LLM_POOL_SIZE
+                    )
+                )
+            )
+        return self._client
+
+    async def chat(self, model: str, messages: List[Dict[str, str]], **params) -> LLMResult:
+        response = await self.client.chat.completions.create(model=model, messages=messages, **params)
+        usage = getattr(response, "usage", None)
+        return LLMResult(response.choices[0].message.content, getattr(usage, "total_tokens", 0) or 0)
+
+    def is_retryable(self, error: Exception) -> bool:
+        import openai
+        return isinstance(error, (
+            openai.RateLimitError,
+            openai.APIConnectionError,  # includes APITimeoutError
+            openai.InternalServerError,
+        ))
+
+
+class StubBackend:
+    """Local backend for tests and offline development; no network calls
+
+    responder(model, messages, params) returns the completion text. By default JSON-mode
+    requests get "{}" and other requests echo the last message.
+    """
+
+    def __init__(self, responder: Callable[[str, List[Dict[str, str]], Dict[str, Any]], str] = None):
+        self.responder = responder
+        self.calls: List[Dict[str, Any]] = []
+
+    async def chat(self, model: str, messages: List[Dict[str, str]], **params) -> LLMResult:
+        self.calls.append({"model": model, "messages": messages, **params})
+        if self.responder is not None:
+            content = self.responder(model, messages, params)
+        elif params.get("response_format", {}).get("type") == "json_object":
+            content = "{}"
+        else:
+            content = messages[-1]["content"] if messages else ""
+        return LLMResult(content, sum(len(message["content"].split()) for message in messages))
+
+    def is_retryable(self, error: Exception) -> bool:
+        return False
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: Optional[int]) -> int:
+    """Rough prompt plus completion size used for the token budget until the real usage is known"""
+    prompt_words = sum(len(message["content"].split()) for message in messages)
+    return int(prompt_words * 4 / 3) + (max_tokens or settings.LLM_DEFAULT_MAX_TOKENS)
+
+
+def _parse_model_limits(value: str) -> Dict[str, int]:
+    """Parse "gpt-4=8,gpt-4o-mini=32" into per-model concurrency limits"""
+    limits = {}
+    for entry in value.split(","):
+        if "=" in entry:
+            model, limit = entry.split("=", 1)
+            limits[model.strip()] = int(limit)
+    return limits
+
+
+class LLMGateway:
+    """Shared entry point for all LLM calls
+
+    Runs on its own event loop thread so that the pooled client, the scheduler and the
+    concurrency limits are shared by every caller: async code awaits chat(), worker threads
+    call chat_sync(). Every attempt waits for its priority class's turn in the scheduler, gets
+    a timeout, and transient failures are retried with jittered exponential backoff. The
+    deadline bounds the whole call, queue wait included, and raises asyncio.TimeoutError.
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self.scheduler = LLMScheduler()
+        self._model_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = StubBackend() if settings.LLM_BACKEND == "stub" else OpenAIBackend()
+        return self._backend
+
+    def set_backend(self, backend):
+        """Swap the backend, e.g. for a StubBackend in tests"""
+        self._backend = backend
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def _model_limit(self, model: str) -> asyncio.Semaphore:
+        # Only ever touched on the gateway loop, so no locking is needed
+        if model not in self._model_limits:
+            limit = _parse_model_limits(settings.LLM_MODEL_CONCURRENCY).get(model, settings.LLM_MAX_CONCURRENCY)
+            self._model_limits[model] = asyncio.Semaphore(limit)
+        return self._model_limits[model]
+
+    async def _attempt(self, model: str, messages: List[Dict[str, str]], timeout: float,
+                       priority: str, tokens: int, params: Dict[str, Any]) -> LLMResult:
+        grant = await self.scheduler.acquire(priority, tokens)
+        result = None
+        try:
+            async with self._model_limit(model):
+                result = await asyncio.wait_for(self.backend.chat(model, messages, **params), timeout)
+            return result
+        finally:
+            self.scheduler.release(grant, result.total_tokens if result else None)
+
+    async def _call(self, model: str, messages: List[Dict[str, str]], timeout: float, priority: str, **params) -> LLMResult:
+        tokens = estimate_tokens(messages, params.get("max_tokens"))
+        attempt = 0
+        while True:
+            try:
+                return await self._attempt(model, messages, timeout, priority, tokens, params)
+            except Exception as e:
+                retryable = isinstance(e, asyncio.TimeoutError) or self.backend.is_retryable(e)
+                if not retryable or attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                # Full jitter keeps retrying callers from synchronizing
+                delay = random.uniform(0, min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * 2 ** attempt))
+                attempt += 1
+                logger.warning(f"LLM call to {model} failed ({type(e).__name__}), retry {attempt} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def _submit(self, messages, model, timeout, priority, deadline, params) -> concurrent.futures.Future:
+        model = model or settings.LLM_MODEL
+        timeout = timeout or settings.LLM_TIMEOUT
+        # Cancelling on the deadline also takes a still-queued request out of the scheduler
+        call = asyncio.wait_for(self._call(model, messages, timeout, priority, **params), deadline)
+        return asyncio.run_coroutine_threadsafe(call, self.loop)
+
+    async def chat(self, messages: List[Dict[str, str]], model: str = None, timeout: float = None,
+                   priority: str = BATCH, deadline: float = None, **params) -> str:
+        """Chat completion text, awaited without blocking the caller's event loop
+
+        priority is the scheduler class: "interactive", "personalization" or "batch".
+        timeout bounds each attempt, deadline (default LLM_DEADLINE) the whole call.
+        """
+        deadline = deadline or settings.LLM_DEADLINE
+        result = await asyncio.wrap_future(self._submit(messages, model, timeout, priority, deadline, params))
+        return result.content
+
+    async def chat_json(self, messages: List[Dict[str, str]], model: str = None, timeout: float = None,
+                        priority: str = BATCH, deadline: float = None, **params) -> Any:
+        """Chat completion in JSON mode, parsed"""
+        content = await self.chat(messages, model, timeout, priority, deadline,
+                                  response_format={"type": "json_object"}, **params)
+        return json.loads(content)
+
+    def chat_sync(self, messages: List[Dict[str, str]], model: str = None, timeout: float = None,
+                  priority: str = BATCH, deadline: float = None, **params) -> str:
+        """Blocking chat completion for worker threads; never call this on an event loop"""
+        deadline = deadline or settings.LLM_DEADLINE
+        future = self._submit(messages, model, timeout, priority, deadline, params)
+        try:
+            # The gateway loop enforces the deadline; this only guards against a stalled loop
+            return future.result(timeout=deadline + 1).content
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def chat_json_sync(self, messages: List[Dict[str, str]], model: str = None, timeout: float = None,
+                       priority: str = BATCH, deadline: float = None, **params) -> Any:
+        content = self.chat_sync(messages, model, timeout, priority, deadline,
+                                 response_format={"type": "json_object"}, **params)
+        return json.loads(content)
+
+    def get_metrics(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """Scheduler queue depth, wait times and budget usage, snapshotted on the gateway loop"""
+        async def snapshot() -> Dict[str, Any]:
+            return self.scheduler.get_metrics()
+
+        return asyncio.run_coroutine_threadsafe(snapshot(), self.loop).result(timeout=timeout)
+
+
+# Global instance
+llm_gateway = LLMGateway()
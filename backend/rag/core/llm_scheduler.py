@@ -0,0 +1,182 @@
+from typing import Any, Deque, Dict, List, Optional
+from collections import deque
+import asyncio
+import time
+from backend.rag.core.config import settings
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+INTERACTIVE = "interactive"
+PERSONALIZATION = "personalization"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, PERSONALIZATION, BATCH)
+
+WINDOW_SECONDS = 60.0
+
+
+def _parse_weights(value: str) -> Dict[str, float]:
+    """Parse "interactive=8,personalization=3,batch=1" into per-class weights"""
+    weights = {INTERACTIVE: 8.0, PERSONALIZATION: 3.0, BATCH: 1.0}
+    for entry in value.split(","):
+        if "=" in entry:
+            priority, weight = entry.split("=", 1)
+            weights[priority.strip()] = float(weight)
+    return weights
+
+
+class _Ticket:
+    __slots__ = ("future", "priority", "tokens", "enqueued", "finish_tag")
+
+    def __init__(self, future: asyncio.Future, priority: str, tokens: int, finish_tag: float):
+        self.future = future
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued = time.monotonic()
+        self.finish_tag = finish_tag
+
+
+class LLMScheduler:
+    """Weighted fair queue in front of every LLM call, within request and token per-minute budgets
+
+    Each priority class gets capacity in proportion to its weight while classes compete, and
+    batch work may not use the last LLM_BATCH_RESERVE share of either budget, so it only
+    soaks up capacity that interactive and personalization traffic leave unused. Must only be
+    used from the LLM gateway loop.
+    """
+
+    def __init__(self, rpm: int = None, tpm: int = None, max_in_flight: int = None,
+                 weights: Dict[str, float] = None, batch_reserve: float = None):
+        self.rpm = settings.LLM_RPM_LIMIT if rpm is None else rpm
+        self.tpm = settings.LLM_TPM_LIMIT if tpm is None else tpm
+        self.max_in_flight = settings.LLM_MAX_CONCURRENCY if max_in_flight is None else max_in_flight
+        self.weights = weights or _parse_weights(settings.LLM_PRIORITY_WEIGHTS)
+        self.batch_reserve = settings.LLM_BATCH_RESERVE if batch_reserve is None else batch_reserve
+
+        self.queues: Dict[str, Deque[_Ticket]] = {priority: deque() for priority in PRIORITIES}
+        self.last_finish = {priority: 0.0 for priority in PRIORITIES}
+        self.virtual_time = 0.0
+        self.window: Deque[List[float]] = deque()  # [dispatch time, tokens] per request in the last minute
+        self.window_tokens = 0.0
+        self.in_flight = 0
+
+        self.dispatched = {priority: 0 for priority in PRIORITIES}
+        self.waits = {priority: deque(maxlen=1000) for priority in PRIORITIES}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def acquire(self, priority: str, estimated_tokens: int) -> List[float]:
+        """Wait for this request's turn; returns a grant to hand back to release()"""
+        if priority not in self.queues:
+            raise ValueError(f"Unknown LLM priority: {priority}")
+        if self._dispatcher is None:
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        # Finish tag: when this request would complete under ideal weighted sharing
+        start = max(self.virtual_time, self.last_finish[priority])
+        ticket = _Ticket(
+            asyncio.get_running_loop().create_future(),
+            priority,
+            estimated_tokens,
+            start + max(estimated_tokens, 1) / self.weights.get(priority, 1.0)
+        )
+        self.last_finish[priority] = ticket.finish_tag
+        self.queues[priority].append(ticket)
+        self._wakeup.set()
+
+        try:
+            return await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                # Granted just as the caller gave up
+                self.release(ticket.future.result(), None)
+            elif ticket in self.queues[priority]:
+                self.queues[priority].remove(ticket)
+            raise
+
+    def release(self, grant: List[float], actual_tokens: Optional[int]):
+        """Free the request's slot and charge its actual token usage to the budget window"""
+        self.in_flight -= 1
+        if actual_tokens and time.monotonic() - grant[0] < WINDOW_SECONDS:
+            self.window_tokens += actual_tokens - grant[1]
+            grant[1] = actual_tokens
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _expire(self, now: float):
+        while self.window and now - self.window[0][0] >= WINDOW_SECONDS:
+            self.window_tokens -= self.window.popleft()[1]
+
+    def _fits(self, ticket: _Ticket) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        share = 1.0 - self.batch_reserve if ticket.priority == BATCH else 1.0
+        if self.rpm and len(self.window) + 1 > self.rpm * share:
+            return False
+        # A request larger than the whole budget still goes through once the window is empty
+        if self.tpm and self.window and self.window_tokens + ticket.tokens > self.tpm * share:
+            return False
+        return True
+
+    def _next_ticket(self) -> Optional[_Ticket]:
+        """Queue head with the smallest finish tag that may run now, or None"""
+        heads = sorted((queue[0] for queue in self.queues.values() if queue), key=lambda t: t.finish_tag)
+        for ticket in heads:
+            if self._fits(ticket):
+                return ticket
+            if ticket.priority != BATCH:
+                # Keep fair order: a waiting higher-class request is not overtaken
+                return None
+        return None
+
+    async def _dispatch(self):
+        while True:
+            now = time.monotonic()
+            self._expire(now)
+            ticket = self._next_ticket()
+            if ticket is None:
+                self._wakeup.clear()
+                timeout = None
+                if any(self.queues.values()) and self.window:
+                    # Budget exhausted: wake when the oldest request leaves the window
+                    timeout = max(self.window[0][0] + WINDOW_SECONDS - now, 0.01)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self.queues[ticket.priority].popleft()
+            if ticket.future.done():
+                continue
+            grant = [now, float(ticket.tokens)]
+            self.window.append(grant)
+            self.window_tokens += ticket.tokens
+            self.in_flight += 1
+            self.virtual_time = max(self.virtual_time, ticket.finish_tag)
+            self.dispatched[ticket.priority] += 1
+            self.waits[ticket.priority].append(now - ticket.enqueued)
+            ticket.future.set_result(grant)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth and wait times per priority class, and current budget usage"""
+        classes = {}
+        for priority in PRIORITIES:
+            waits = sorted(self.waits[priority])
+            classes[priority] = {
+                "queue_depth": len(self.queues[priority]),
+                "dispatched": self.dispatched[priority],
+                "weight": self.weights.get(priority, 1.0),
+                "wait_p50_ms": round(waits[len(waits) // 2] * 1000, 1) if waits else None,
+                "wait_p95_ms": round(waits[min(int(len(waits) * 0.95), len(waits) - 1)] * 1000, 1) if waits else None,
+                "wait_max_ms": round(waits[-1] * 1000, 1) if waits else None,
+            }
+        return {
+            "priorities": classes,
+            "in_flight": self.in_flight,
+            "requests_last_minute": len(self.window),
+            "tokens_last_minute": int(self.window_tokens),
+            "rpm_limit": self.rpm or None,
+            "tpm_limit": self.tpm or None,
+        }
@@ -1,19 +1,58 @@
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.http import models
 from typing import List, Dict, Any, Optional
+import httpx
+import math
+import threading
+import time
+import uuid
 from backend.rag.core.config import settings
 
+PAYLOAD_INDEX_FIELDS = ("chapter_id", "embedding_model", "embedding_model_version")
+
 
 class QdrantSetup:
-    def __init__(self):
-        # Initialize Qdrant client
-        if settings.QDRANT_API_KEY:
-            self.client = QdrantClient(
-                url=settings.QDRANT_URL,
-                api_key=settings.QDRANT_API_KEY
+    def __init__(self, prefer_grpc: Optional[bool] = None):
+        # Clients are created lazily on first use and then shared by all threads
+        self.prefer_grpc = settings.QDRANT_PREFER_GRPC if prefer_grpc is None else prefer_grpc
+        self._client: Optional[QdrantClient] = None
+        self._async_client: Optional[AsyncQdrantClient] = None
+        self._client_lock = threading.Lock()
+
+    def _client_kwargs(self) -> Dict[str, Any]:
+        """Build the connection settings shared by the sync and async clients"""
+        kwargs = {
+            "url": settings.QDRANT_URL,
+            "prefer_grpc": self.prefer_grpc,
+            "grpc_port": settings.QDRANT_GRPC_PORT,
+            "timeout": settings.QDRANT_TIMEOUT,
+            # Connection pool for the REST transport; gRPC multiplexes over one channel
+            "limits": httpx.Limits(
+                max_connections=settings.QDRANT_POOL_SIZE,
+                max_keepalive_connections=settings.QDRANT_POOL_SIZE
             )
-        else:
-            self.client = QdrantClient(url=settings.QDRANT_URL)
+        }
+        if settings.QDRANT_API_KEY:
+            kwargs["api_key"] = settings.QDRANT_API_KEY
+        return kwargs
+
+    @property
+    def client(self) -> QdrantClient:
+        """Shared synchronous Qdrant client"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = QdrantClient(**self._client_kwargs())
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        """Shared asynchronous Qdrant client for the async request path"""
+        if self._async_client is None:
+            with self._client_lock:
+                if self._async_client is None:
+                    self._async_client = AsyncQdrantClient(**self._client_kwargs())
+        return self._async_client
 
     def create_collection(self):
         """Create the textbook chunks collection if it doesn't exist"""
@@ -26,34 +65,294 @@ class QdrantSetup:
                 collection_name=settings.QDRANT_COLLECTION_NAME,
                 vectors_config=models.VectorParams(
                     size=settings.EMBEDDING_DIMENSION,
-                    distance=models.Distance.COSINE
+                    distance=models.Distance.COSINE,
+                    on_disk=settings.QDRANT_ON_DISK
                 ),
-            )
-
-            # Create payload index for chapter_id to optimize search
-            self.client.create_payload_index(
-                collection_name=settings.QDRANT_COLLECTION_NAME,
-                field_name="chapter_id",
-                field_schema=models.PayloadSchemaType.KEYWORD
+                hnsw_config=self._build_hnsw_config(),
+                quantization_config=self._build_quantization_config(),
             )
 
             print(f"Created collection: {settings.QDRANT_COLLECTION_NAME}")
         else:
             print(f"Collection {settings.QDRANT_COLLECTION_NAME} already exists")
 
+        self._ensure_payload_indexes()
+
+    def _ensure_payload_indexes(self):
+        """Keyword indexes for chapter filters and the per-chapter/per-model counts in the stats"""
+        existing = self.client.get_collection(settings.QDRANT_COLLECTION_NAME).payload_schema or {}
+        for field_name in PAYLOAD_INDEX_FIELDS:
+            if field_name not in existing:
+                self.client.create_payload_index(
+                    collection_name=settings.QDRANT_COLLECTION_NAME,
+                    field_name=field_name,
+                    field_schema=models.PayloadSchemaType.KEYWORD
+                )
+
+    def _build_hnsw_config(self) -> models.HnswConfigDiff:
+        """Build the HNSW index settings from configuration"""
+        return models.HnswConfigDiff(
+            m=settings.QDRANT_HNSW_M,
+            ef_construct=settings.QDRANT_HNSW_EF_CONSTRUCT
+        )
+
+    def _build_quantization_config(self) -> Optional[models.QuantizationConfig]:
+        """Build the vector quantization settings from configuration"""
+        quantization = settings.QDRANT_QUANTIZATION.lower()
+        if quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=settings.QDRANT_QUANTIZATION_ALWAYS_RAM
+                )
+            )
+        if quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(
+                    always_ram=settings.QDRANT_QUANTIZATION_ALWAYS_RAM
+                )
+            )
+        if quantization not in ("", "none"):
+            raise ValueError(f"Unsupported QDRANT_QUANTIZATION value: {settings.QDRANT_QUANTIZATION}")
+        return None
+
+    def _build_search_params(self, exact: bool = False) -> models.SearchParams:
+        """Build search parameters, oversampling and rescoring when vectors are quantized"""
+        quantization_params = None
+        if self._build_quantization_config() is not None:
+            quantization_params = models.QuantizationSearchParams(
+                ignore=exact,
+                rescore=settings.QDRANT_SEARCH_RESCORE,
+                oversampling=settings.QDRANT_SEARCH_OVERSAMPLING
+            )
+
+        return models.SearchParams(
+            hnsw_ef=settings.QDRANT_SEARCH_HNSW_EF,
+            exact=exact,
+            quantization=quantization_params
+        )
+
+    def update_collection_settings(self):
+        """Apply the configured storage, index and quantization settings to the existing collection.
+
+        Qdrant rebuilds the HNSW graph and quantized vectors in the background after this call.
+        """
+        quantization_config = self._build_quantization_config()
+        self.client.update_collection(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            vectors_config={
+                "": models.VectorParamsDiff(on_disk=settings.QDRANT_ON_DISK)
+            },
+            hnsw_config=self._build_hnsw_config(),
+            quantization_config=quantization_config if quantization_config is not None else models.Disabled.DISABLED
+        )
+
+    def wait_for_green_status(self, timeout: float = 600.0, poll_interval: float = 1.0) -> bool:
+        """Wait until the collection has finished optimizing and indexing"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            info = self.client.get_collection(settings.QDRANT_COLLECTION_NAME)
+            if info.status == models.CollectionStatus.GREEN:
+                return True
+            time.sleep(poll_interval)
+        return False
+
+    def estimate_memory_usage(self) -> Dict[str, int]:
+        """Estimate the RAM and disk footprint of the collection from its live configuration"""
+        info = self.client.get_collection(settings.QDRANT_COLLECTION_NAME)
+        points_count = info.points_count or 0
+        vector_params = info.config.params.vectors
+        dimension = vector_params.size
+
+        original_bytes = points_count * dimension * 4  # float32
+        quantized_bytes = 0
+        quantized_in_ram = False
+        quantization = info.config.quantization_config
+        if isinstance(quantization, models.ScalarQuantization):
+            quantized_bytes = points_count * dimension
+            quantized_in_ram = bool(quantization.scalar.always_ram) or not vector_params.on_disk
+        elif isinstance(quantization, models.BinaryQuantization):
+            quantized_bytes = points_count * math.ceil(dimension / 8)
+            quantized_in_ram = bool(quantization.binary.always_ram) or not vector_params.on_disk
+
+        # Level-0 HNSW links dominate the graph size: 2 * m neighbours of 4 bytes each per point
+        hnsw_bytes = points_count * info.config.hnsw_config.m * 2 * 4
+
+        ram_bytes = hnsw_bytes
+        if not vector_params.on_disk:
+            ram_bytes += original_bytes
+        if quantized_in_ram:
+            ram_bytes += quantized_bytes
+
+        return {
+            "points_count": points_count,
+            "original_vectors_bytes": original_bytes,
+            "quantized_vectors_bytes": quantized_bytes,
+            "hnsw_graph_bytes": hnsw_bytes,
+            "estimated_ram_bytes": ram_bytes,
+            "estimated_disk_bytes": original_bytes + quantized_bytes + hnsw_bytes
+        }
+
+    def sample_vectors(self, count: int) -> List[List[float]]:
+        """Fetch stored vectors to use as evaluation queries"""
+        records, _ = self.client.scroll(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            limit=count,
+            with_payload=False,
+            with_vectors=True
+        )
+        return [record.vector for record in records]
+
+    def measure_recall(self, query_vectors: List[List[float]], k: int = 10) -> float:
+        """Measure recall@k of the configured (approximate) search against exact search"""
+        if not query_vectors:
+            return 0.0
+
+        total_recall = 0.0
+        for query_vector in query_vectors:
+            exact_hits = self.client.query_points(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                query=query_vector,
+                limit=k,
+                search_params=self._build_search_params(exact=True)
+            ).points
+            approximate_hits = self.client.query_points(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                query=query_vector,
+                limit=k,
+                search_params=self._build_search_params()
+            ).points
+            expected_ids = {hit.id for hit in exact_hits}
+            if not expected_ids:
+                continue
+            found_ids = {hit.id for hit in approximate_hits}
+            total_recall += len(expected_ids & found_ids) / len(expected_ids)
+
+        return total_recall / len(query_vectors)
+
+    def get_collection_info(self) -> Dict[str, Any]:
+        """Get live size, segment and indexing status information for the collection"""
+        info = self.client.get_collection(settings.QDRANT_COLLECTION_NAME)
+        points_count = info.points_count or 0
+        indexed_vectors_count = info.indexed_vectors_count or 0
+        quantization = info.config.quantization_config
+
+        return {
+            "status": info.status.value if hasattr(info.status, "value") else str(info.status),
+            "optimizer_status": str(info.optimizer_status),
+            "points_count": points_count,
+            "indexed_vectors_count": indexed_vectors_count,
+            "segments_count": info.segments_count,
+            # Points not yet covered by the HNSW index are served by slow brute-force scans
+            "unindexed_points_count": max(points_count - indexed_vectors_count, 0),
+            "hnsw_m": info.config.hnsw_config.m,
+            "hnsw_ef_construct": info.config.hnsw_config.ef_construct,
+            "on_disk": bool(info.config.params.vectors.on_disk),
+            "quantization": type(quantization).__name__ if quantization is not None else None
+        }
+
+    def count_by_payload(self, points_count: int, max_chapters: int = 10000) -> Dict[str, Dict[str, int]]:
+        """Points per chapter and per embedding model version, counted server-side on payload indexes
+
+        Chapters come from a facet on chapter_id. Points embedded with anything other than the
+        configured model version are reported together under "other".
+        """
+        facet = self.client.facet(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            key="chapter_id",
+            limit=max_chapters,
+            exact=True
+        )
+        chapter_counts = {str(hit.value): hit.count for hit in facet.hits}
+
+        current = self.client.count(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            count_filter=models.Filter(must=[
+                models.FieldCondition(key="embedding_model", match=models.MatchValue(value=settings.EMBEDDING_MODEL)),
+                models.FieldCondition(
+                    key="embedding_model_version",
+                    match=models.MatchValue(value=settings.EMBEDDING_MODEL_VERSION)
+                ),
+            ]),
+            exact=True
+        ).count
+        model_counts = {f"{settings.EMBEDDING_MODEL}@{settings.EMBEDDING_MODEL_VERSION}": current}
+        if points_count > current:
+            model_counts["other"] = points_count - current
+
+        return {"chapters": chapter_counts, "embedding_models": model_counts}
+
+    def scroll_all_points(self, batch_size: int = 1000):
+        """Yield every point in the collection with its vector and payload, one page at a time"""
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            yield records
+            if offset is None:
+                break
+
+    def get_chapter_chunks(self, chapter_id: str, batch_size: int = 256) -> List[Dict[str, Any]]:
+        """All chunks of one chapter with their vectors, via the chapter_id payload index"""
+        chapter_filter = models.Filter(
+            must=[models.FieldCondition(key="chapter_id", match=models.MatchValue(value=chapter_id))]
+        )
+        chunks = []
+        offset = None
+        while True:
+            records, offset = self.client.scroll(
+                collection_name=settings.QDRANT_COLLECTION_NAME,
+                scroll_filter=chapter_filter,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            chunks.extend(self._format_record(record) for record in records)
+            if offset is None:
+                break
+        return chunks
+
+    def restore_points(self, ids: List[Any], vectors, payloads: List[Dict[str, Any]], batch_size: int = 256):
+        """Bulk-load points into the collection, e.g. from a snapshot"""
+        self.create_collection()
+        self.client.upload_collection(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=batch_size,
+            parallel=1,
+            wait=True
+        )
+
+    def _point_id(self, chunk: Dict[str, Any], index: int) -> str:
+        """Deterministic point ID so re-indexing a chapter overwrites its own chunks only"""
+        chapter_id = chunk.get('chapter_id', '')
+        position = chunk.get('position', index)
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{settings.QDRANT_COLLECTION_NAME}/{chapter_id}/{position}"))
+
     def add_textbook_chunks(self, chunks: List[Dict[str, Any]]):
         """Add textbook content chunks to the vector database"""
         points = []
         for i, chunk in enumerate(chunks):
             point = models.PointStruct(
-                id=i,
+                id=self._point_id(chunk, i),
                 vector=chunk['vector'],
                 payload={
                     "chapter_id": chunk.get('chapter_id', ''),
                     "section_id": chunk.get('section_id', ''),
                     "chunk_text": chunk['text'],
                     "original_position": chunk.get('position', i),
-                    "heading_hierarchy": chunk.get('heading_hierarchy', '')
+                    "heading_hierarchy": chunk.get('heading_hierarchy', ''),
+                    "embedding_model": settings.EMBEDDING_MODEL,
+                    "embedding_model_version": settings.EMBEDDING_MODEL_VERSION
                 }
             )
             points.append(point)
@@ -66,23 +365,76 @@ class QdrantSetup:
 
     def search_chunks(self, query_vector: List[float], limit: int = 6) -> List[Dict[str, Any]]:
         """Search for relevant chunks based on query vector"""
-        results = self.client.search(
+        results = self.client.query_points(
             collection_name=settings.QDRANT_COLLECTION_NAME,
-            query_vector=query_vector,
+            query=query_vector,
             limit=limit,
-            score_threshold=settings.SCORE_THRESHOLD
-        )
+            score_threshold=settings.SCORE_THRESHOLD,
+            search_params=self._build_search_params(),
+            with_payload=True
+        ).points
 
-        return [
-            {
-                "text": hit.payload["chunk_text"],
-                "score": hit.score,
-                "chapter_id": hit.payload.get("chapter_id", ""),
-                "section_id": hit.payload.get("section_id", ""),
-                "original_position": hit.payload.get("original_position", 0)
-            }
-            for hit in results
+        return [self._format_hit(hit) for hit in results]
+
+    def search_batch(self, query_vectors: List[List[float]], limit: int = 6) -> List[List[Dict[str, Any]]]:
+        """Search for relevant chunks for many query vectors in a single round trip"""
+        if not query_vectors:
+            return []
+
+        search_params = self._build_search_params()
+        requests = [
+            models.QueryRequest(
+                query=query_vector,
+                limit=limit,
+                score_threshold=settings.SCORE_THRESHOLD,
+                params=search_params,
+                with_payload=True
+            )
+            for query_vector in query_vectors
         ]
+        batch_results = self.client.query_batch_points(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            requests=requests
+        )
+
+        return [[self._format_hit(hit) for hit in response.points] for response in batch_results]
+
+    async def search_chunks_async(self, query_vector: List[float], limit: int = 6) -> List[Dict[str, Any]]:
+        """Search for relevant chunks without blocking the event loop"""
+        response = await self.async_client.query_points(
+            collection_name=settings.QDRANT_COLLECTION_NAME,
+            query=query_vector,
+            limit=limit,
+            score_threshold=settings.SCORE_THRESHOLD,
+            search_params=self._build_search_params(),
+            with_payload=True
+        )
+        results = response.points
+
+        return [self._format_hit(hit) for hit in results]
+
+    def _format_record(self, record: models.Record) -> Dict[str, Any]:
+        payload = record.payload or {}
+        return {
+            "id": record.id,
+            "text": payload.get("chunk_text", ""),
+            "vector": record.vector,
+            "chapter_id": payload.get("chapter_id", ""),
+            "section_id": payload.get("section_id", ""),
+            "heading_hierarchy": payload.get("heading_hierarchy", ""),
+            "original_position": payload.get("original_position", 0)
+        }
+
+    def _format_hit(self, hit: models.ScoredPoint) -> Dict[str, Any]:
+        """Convert a scored point into the chunk dictionary returned by searches"""
+        return {
+            "id": hit.id,
+            "text": hit.payload["chunk_text"],
+            "score": hit.score,
+            "chapter_id": hit.payload.get("chapter_id", ""),
+            "section_id": hit.payload.get("section_id", ""),
+            "original_position": hit.payload.get("original_position", 0)
+        }
 
 
 # Global instance
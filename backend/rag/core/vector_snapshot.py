@@ -0,0 +1,117 @@
+from typing import List, Dict, Any, Tuple
+import json
+import struct
+import numpy as np
+from backend.rag.core.config import settings
+
+# Snapshot file layout:
+#   magic (8 bytes) | header length (uint64) | matrix offset (uint64) | JSON header | padding | float32 matrix
+# The matrix starts on a 64-byte boundary so it can be memory-mapped directly.
+SNAPSHOT_MAGIC = b"TBVSNAP1"
+SNAPSHOT_FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<8sQQ")
+_ALIGNMENT = 64
+
+
+def write_snapshot(path: str, ids: List[Any], payloads: List[Dict[str, Any]], vectors: np.ndarray, metadata: Dict[str, Any]):
+    """Write ids, payloads and a float32 vector matrix to a single snapshot file"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2 or vectors.shape[0] != len(ids) or len(ids) != len(payloads):
+        raise ValueError("Snapshot ids, payloads and vectors must have matching lengths")
+
+    header = {
+        **metadata,
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "count": int(vectors.shape[0]),
+        "dimension": int(vectors.shape[1]),
+        "dtype": "float32",
+        "ids": ids,
+        "payloads": payloads
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    matrix_offset = _PREAMBLE.size + len(header_bytes)
+    matrix_offset += -matrix_offset % _ALIGNMENT
+
+    with open(path, "wb") as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, len(header_bytes), matrix_offset))
+        f.write(header_bytes)
+        f.write(b"\0" * (matrix_offset - _PREAMBLE.size - len(header_bytes)))
+        f.write(vectors.tobytes(order="C"))
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Read a snapshot header and memory-map its vector matrix without copying it"""
+    with open(path, "rb") as f:
+        magic, header_length, matrix_offset = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a vector snapshot file")
+        header = json.loads(f.read(header_length).decode("utf-8"))
+
+    if header.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version: {header.get('format_version')}")
+
+    shape = (header["count"], header["dimension"])
+    if header["count"] == 0:
+        return header, np.zeros(shape, dtype=np.float32)
+    vectors = np.memmap(path, dtype=np.float32, mode="r", offset=matrix_offset, shape=shape)
+    return header, vectors
+
+
+class LocalVectorIndex:
+    """Brute-force cosine search over a memory-mapped snapshot, used when no Qdrant instance is available"""
+
+    def __init__(self, path: str):
+        self.header, self.vectors = read_snapshot(path)
+        self.ids = self.header["ids"]
+        self.payloads = self.header["payloads"]
+        self.norms = np.linalg.norm(self.vectors, axis=1)
+        self.norms[self.norms == 0] = 1.0
+
+    def search(self, query_vector: List[float], limit: int = 6) -> List[Dict[str, Any]]:
+        """Search for the most similar chunks to a query vector"""
+        return self.search_batch([query_vector], limit)[0]
+
+    def search_batch(self, query_vectors: List[List[float]], limit: int = 6) -> List[List[Dict[str, Any]]]:
+        """Search for several query vectors with one matrix multiplication"""
+        if not query_vectors or len(self.ids) == 0:
+            return [[] for _ in query_vectors]
+
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        query_norms[query_norms == 0] = 1.0
+        scores = (queries / query_norms) @ self.vectors.T / self.norms
+
+        limit = min(limit, len(self.ids))
+        results = []
+        for row in scores:
+            top = np.argpartition(-row, limit - 1)[:limit]
+            top = top[np.argsort(-row[top])]
+            results.append([
+                self._format_hit(index, float(row[index]))
+                for index in top
+                if row[index] >= settings.SCORE_THRESHOLD
+            ])
+        return results
+
+    def get_chapter_chunks(self, chapter_id: str) -> List[Dict[str, Any]]:
+        """All chunks of one chapter with their vectors"""
+        chunks = []
+        for index, payload in enumerate(self.payloads):
+            if payload.get("chapter_id", "") == chapter_id:
+                chunk = self._format_hit(index, 0.0)
+                del chunk["score"]
+                chunk["vector"] = self.vectors[index].tolist()
+                chunk["heading_hierarchy"] = payload.get("heading_hierarchy", "")
+                chunks.append(chunk)
+        return chunks
+
+    def _format_hit(self, index: int, score: float) -> Dict[str, Any]:
+        payload = self.payloads[index]
+        return {
+            "id": self.ids[index],
+            "text": payload["chunk_text"],
+            "score": score,
+            "chapter_id": payload.get("chapter_id", ""),
+            "section_id": payload.get("section_id", ""),
+            "original_position": payload.get("original_position", 0)
+        }
@@ -9,6 +9,9 @@ class User(BaseModel):
     email: str
     name: Optional[str] = None
     background: Optional[str] = None
+    audience_type: Optional[str] = None  # classification of the background
+    complexity_level: Optional[str] = None
+    background_hash: Optional[str] = None  # normalized background the classification was made from
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 from pydantic import BaseModel
 from datetime import datetime
 from enum import Enum
@@ -45,4 +45,22 @@ class PersonalizationRequest(BaseModel):
 class PersonalizationResponse(BaseModel):
     personalized_content: str
     original_background: str
-    personalization_applied: bool = True
\ No newline at end of file
+    personalization_applied: bool = True
+
+
+class BatchPersonalizationRequest(BaseModel):
+    user_background: str
+    items: List[str]  # content fragments adapted for the same background
+
+
+class BatchPersonalizationItem(BaseModel):
+    index: int
+    adapted_content: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchPersonalizationResponse(BaseModel):
+    audience_type: str
+    complexity_level: str
+    results: List[BatchPersonalizationItem]  # in request order
+    failed: int = 0
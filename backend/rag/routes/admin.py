@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from starlette.concurrency import run_in_threadpool
+from backend.auth.auth import auth_handler
+from backend.rag.services.vector_service import vector_service
+from backend.rag.core.llm_gateway import llm_gateway
+from backend.rag.core.logging_config import get_logger
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(auth_handler.get_current_user)]
+)
+
+logger = get_logger(__name__)
+
+
+@router.get("/vector-stats")
+async def get_vector_stats():
+    """Get live vector index size, indexing health, per-chapter counts and search latency"""
+    logger.info("Fetching vector collection statistics")
+    # Blocking Qdrant calls stay off the event loop
+    return await run_in_threadpool(vector_service.get_collection_stats)
+
+
+@router.get("/llm-stats")
+async def get_llm_stats():
+    """Get LLM scheduler queue depth and wait times per priority class, and rate budget usage"""
+    logger.info("Fetching LLM scheduler statistics")
+    # Waits for a snapshot taken on the gateway loop
+    return await run_in_threadpool(llm_gateway.get_metrics)
@@ -5,6 +5,7 @@ from backend.rag.models.user import UserCreate, UserUpdate
 from backend.shared.types import User as SharedUser
 from backend.auth.auth import auth_handler, security
 from backend.rag.services.user_service import user_service
+from backend.rag.services.personalization_service import personalization_service
 from backend.auth.config import get_access_token_expire_delta
 from backend.rag.core.logging_config import get_logger
 
@@ -104,5 +105,14 @@ async def update_profile(
             detail="User not found"
         )
 
+    if updated_user.background:
+        # Classify a changed background once here so personalization reads it from the profile
+        try:
+            await personalization_service.classify_for_user(updated_user)
+            updated_user = await user_service.get_user_by_id(updated_user.id)
+        except Exception as e:
+            # The profile is saved; personalization classifies again on its next request
+            logger.error(f"Background classification failed for user {updated_user.id}: {e}")
+
     logger.info(f"User profile updated successfully: {updated_user.email}")
     return updated_user
\ No newline at end of file
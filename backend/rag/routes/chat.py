@@ -17,7 +17,7 @@ async def query_chat(query: ChatQuery):
     """Main chat endpoint with RAG"""
     logger.info(f"Received chat query: {query.query[:50]}...")
     try:
-        response = rag_service.query(query.query)
+        response = await rag_service.query_async(query.query, multi_query=query.multi_query)
 
         # Format citations for the response
         formatted_sources = citation_service.format_citations(response.sources)
@@ -1,12 +1,19 @@
-from fastapi import APIRouter
-from backend.rag.models.user_background import PersonalizationRequest as UserPersonalizationRequest
-from backend.rag.services.personalization_service import PersonalizationService
+from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+from backend.rag.models.user_background import (
+    PersonalizationRequest as UserPersonalizationRequest,
+    BatchPersonalizationRequest,
+    BatchPersonalizationResponse,
+)
+from backend.rag.core.config import settings
+from backend.shared.types import User as SharedUser
+from backend.auth.auth import auth_handler
+from backend.rag.services.personalization_service import personalization_service
+from backend.rag.services.chapter_service import chapter_service
 from backend.rag.core.logging_config import get_logger
 
 router = APIRouter(prefix="/personalization", tags=["personalization"])
 
-# Initialize personalization service
-personalization_service = PersonalizationService()
 logger = get_logger(__name__)
 
 
@@ -15,7 +22,7 @@ async def adapt_content(request: UserPersonalizationRequest):
     """Adapt content based on user background"""
     logger.info(f"Adapting content for background: {request.user_background}")
 
-    adapted_content = personalization_service.personalize_content(
+    adapted_content = await personalization_service.personalize_content_async(
         request.content,
         request.user_background
     )
@@ -24,12 +31,85 @@ async def adapt_content(request: UserPersonalizationRequest):
     return {"adapted_content": adapted_content}
 
 
+@router.post("/adapt-content/batch", response_model=BatchPersonalizationResponse)
+async def adapt_content_batch(request: BatchPersonalizationRequest):
+    """Adapt several content fragments for one background in a single call"""
+    if len(request.items) > settings.PERSONALIZATION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.PERSONALIZATION_BATCH_MAX_ITEMS} items per batch"
+        )
+    logger.info(f"Adapting {len(request.items)} items for background: {request.user_background}")
+
+    response = await personalization_service.personalize_batch(request.items, request.user_background)
+
+    logger.info(f"Batch adaptation completed with {response['failed']} failed items")
+    return response
+
+
 @router.post("/classify-background")
 async def classify_background(background: str):
     """Classify user background into categories"""
     logger.info(f"Classifying background: {background}")
 
-    classification = personalization_service.classify_user_background(background)
+    classification = await personalization_service.classify_user_background_async(background)
 
     logger.info(f"Background classified successfully: {classification}")
-    return classification
\ No newline at end of file
+    return classification
+
+
+@router.get("/chapters/{chapter_id}")
+async def get_personalized_chapter(chapter_id: UUID,
+                                   current_user: SharedUser = Depends(auth_handler.get_current_user)):
+    """Get the chapter variant for the current user's complexity level"""
+    chapter = await chapter_service.get_chapter_by_id(chapter_id)
+    if not chapter:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chapter not found"
+        )
+
+    personalized = await personalization_service.get_personalized_chapter_for_user(
+        current_user, chapter.id, chapter.content
+    )
+
+    logger.info(f"Served {personalized['complexity_level']} variant of chapter {chapter_id} "
+                f"(cached: {personalized['cached']})")
+    return personalized
+
+
+@router.get("/chapters/{chapter_id}/sections")
+async def get_personalized_section_statuses(chapter_id: UUID,
+                                            current_user: SharedUser = Depends(auth_handler.get_current_user)):
+    """List a chapter's sections with their cache status for the current user's complexity level"""
+    chapter = await chapter_service.get_chapter_by_id(chapter_id)
+    if not chapter:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chapter not found"
+        )
+
+    return await personalization_service.get_section_statuses(current_user, chapter)
+
+
+@router.get("/chapters/{chapter_id}/sections/{section_id}")
+async def get_personalized_section(chapter_id: UUID, section_id: UUID,
+                                   current_user: SharedUser = Depends(auth_handler.get_current_user)):
+    """Get one section adapted for the current user, prefetching the next section"""
+    chapter = await chapter_service.get_chapter_by_id(chapter_id)
+    if not chapter:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chapter not found"
+        )
+
+    personalized = await personalization_service.get_personalized_section(current_user, chapter, section_id)
+    if personalized is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Section not found"
+        )
+
+    logger.info(f"Served {personalized['complexity_level']} variant of section {section_id} "
+                f"(cached: {personalized['cached']})")
+    return personalized
@@ -1,29 +1,66 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict
+from uuid import UUID
+import asyncio
+import json
 from backend.shared.types import TranslationRequest
-from backend.rag.services.translation_service import UrduTranslationService
+from backend.rag.services.translation_service import urdu_translation_service
 from backend.rag.services.markdown_preservation import markdown_preservation_service
+from backend.rag.services.chapter_service import chapter_service
+from backend.rag.services.chapter_translation_service import chapter_translation_service
+from backend.rag.services.translation_executor import (
+    translation_executor,
+    TranslationQueueFullError,
+    TranslationCancelledError,
+)
 from backend.rag.core.logging_config import get_logger
 
 router = APIRouter(prefix="/translation", tags=["translation"])
 
-# Initialize translation service
-translation_service = UrduTranslationService()
+# Shared translation service
+translation_service = urdu_translation_service
 logger = get_logger(__name__)
 
 
+async def run_translation(request: Request, func, *args):
+    """Run a translation call on the bounded translation executor, mapping saturation and timeouts to HTTP errors"""
+    try:
+        return await translation_executor.run(func, *args, request=request)
+    except TranslationQueueFullError as e:
+        logger.warning(f"Rejecting translation request: queue depth {translation_executor.queue_depth}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Translation service is busy, please retry later",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Translation timed out"
+        )
+    except TranslationCancelledError:
+        # The client is gone; nobody will read this response
+        raise HTTPException(status_code=499, detail="Client closed request")
+
+
 @router.post("/urdu")
-async def translate_to_urdu(translation_request: TranslationRequest):
+async def translate_to_urdu(translation_request: TranslationRequest, request: Request):
     """Translate content to Urdu"""
     logger.info(f"Received translation request with formatting preservation: {translation_request.preserve_formatting}")
 
     if translation_request.preserve_formatting:
         # Use markdown preservation service
-        translated_content = markdown_preservation_service.translate_content_preserving_formatting(
+        translated_content = await run_translation(
+            request,
+            markdown_preservation_service.translate_content_preserving_formatting,
             translation_request.content
         )
     else:
         # Use basic translation service
-        translated_content = translation_service.translate_content(
+        translated_content = await run_translation(
+            request,
+            translation_service.translate_content,
             translation_request.content,
             translation_request.preserve_formatting
         )
@@ -33,14 +70,97 @@ async def translate_to_urdu(translation_request: TranslationRequest):
 
 
 @router.post("/urdu/blocks")
-async def translate_to_urdu_by_blocks(translation_request: TranslationRequest):
+async def translate_to_urdu_by_blocks(translation_request: TranslationRequest, request: Request):
     """Translate content to Urdu by blocks to preserve formatting"""
     logger.info("Received translation request by blocks")
 
     # Use block-based translation to preserve formatting
-    translated_content = markdown_preservation_service.translate_by_blocks(
+    translated_content = await run_translation(
+        request,
+        markdown_preservation_service.translate_by_blocks,
         translation_request.content
     )
 
     logger.info("Block-based translation completed successfully")
-    return {"translated_content": translated_content}
\ No newline at end of file
+    return {"translated_content": translated_content}
+
+
+def _format_event(event: Dict[str, Any], stream_format: str, event_name: str = "block") -> str:
+    data = json.dumps(event, ensure_ascii=False)
+    if stream_format == "sse":
+        return f"event: {event_name}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _stream_translated_blocks(content: str, request: Request, stream_format: str) -> AsyncIterator[str]:
+    """Drive the block translator one window at a time on the translation executor"""
+    blocks = translation_service.iter_translated_blocks(content)
+    sent = 0
+    try:
+        while True:
+            try:
+                batch = await translation_executor.run(next, blocks, None, request=request)
+            except TranslationQueueFullError as e:
+                yield _format_event({"error": "Translation service is busy", "retry_after": e.retry_after},
+                                    stream_format, "error")
+                return
+            except asyncio.TimeoutError:
+                yield _format_event({"error": "Translation timed out"}, stream_format, "error")
+                return
+            except TranslationCancelledError:
+                logger.info(f"Client disconnected after {sent} streamed blocks")
+                return
+
+            if batch is None:
+                break
+            for event in batch:
+                yield _format_event(event, stream_format)
+            sent += len(batch)
+
+        yield _format_event({"done": True, "blocks": sent}, stream_format, "done")
+    finally:
+        try:
+            blocks.close()
+        except ValueError:
+            # Still running on an abandoned worker, which stops at its next cancellation check
+            pass
+
+
+@router.post("/urdu/stream")
+async def stream_urdu_translation(translation_request: TranslationRequest, request: Request,
+                                  stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$")):
+    """Stream the Urdu translation block by block, in document order
+
+    Emits one event per block ({"index", "type", "markdown"}) followed by {"done": true, "blocks": n};
+    joining the blocks' markdown with newlines gives the full translation. Blocks already in the
+    translation memory are sent without waiting for the model.
+    """
+    logger.info(f"Received streaming translation request ({stream_format})")
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(
+        _stream_translated_blocks(translation_request.content, request, stream_format),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/chapters/{chapter_id}/urdu")
+async def get_chapter_urdu(chapter_id: UUID):
+    """Get the precomputed Urdu translation of a chapter without waiting for the model"""
+    chapter = await chapter_service.get_chapter_by_id(chapter_id)
+    if not chapter:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Chapter not found"
+        )
+
+    translation_status = chapter_translation_service.get_status(chapter.id, chapter.content)
+    if translation_status["stale"] and not translation_status["refresh_pending"]:
+        # No stored translation for this content yet; refresh it in the background
+        translation_status["refresh_pending"] = chapter_service.schedule_translation(chapter)
+
+    if translation_status["urdu_content"] is None:
+        # Fall back to whatever translation the chapter already carries
+        translation_status["urdu_content"] = chapter.urdu_content
+
+    return translation_status
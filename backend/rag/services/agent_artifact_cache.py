@@ -0,0 +1,150 @@
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+import time
+from backend.rag.core.config import settings
+from backend.rag.services.markdown_tokenizer import content_hash
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# (agent, prompt version, parameters, content hash)
+ArtifactKey = Tuple[str, str, str, str]
+
+
+def _params_key(params: Dict[str, Any]) -> str:
+    # The model is part of the key: switching LLM_MODEL must not serve another model's artifacts
+    return json.dumps({"model": settings.LLM_MODEL, **(params or {})}, sort_keys=True)
+
+
+class AgentArtifactCache:
+    """Generated agent artifacts (summaries, quizzes, boosters) in SQLite behind an LRU
+
+    Entries are keyed by (agent, prompt version, parameters, content hash), so edited content
+    or a changed prompt never hits a stale artifact. Entries stored with a chapter id are
+    dropped when that chapter changes; entries without one (section summaries) are capped
+    at max_unbound entries, oldest dropped first.
+    """
+
+    def __init__(self, db_path: str = None, lru_size: int = None, max_unbound: int = None):
+        self.db_path = db_path or settings.AGENT_CACHE_PATH
+        self.lru_size = lru_size or settings.AGENT_CACHE_LRU_SIZE
+        self.max_unbound = settings.AGENT_CACHE_MAX_UNBOUND if max_unbound is None else max_unbound
+        self._lru: "OrderedDict[ArtifactKey, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS agent_artifacts (
+                agent TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                params TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                chapter_id TEXT,
+                artifact TEXT NOT NULL,
+                stored_at REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (agent, prompt_version, params, content_hash)
+            )
+            """
+        )
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(agent_artifacts)")}
+        if "stored_at" not in columns:
+            # Caches created before the unbound-entry cap
+            self._connection.execute("ALTER TABLE agent_artifacts ADD COLUMN stored_at REAL NOT NULL DEFAULT 0")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS agent_artifacts_chapter ON agent_artifacts (chapter_id)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS agent_artifacts_stored ON agent_artifacts (stored_at)")
+        self._connection.commit()
+
+    def get(self, agent: str, prompt_version: str, params: Dict[str, Any], content: str) -> Optional[Any]:
+        """Cached artifact for this content, or None"""
+        key = (agent, str(prompt_version), _params_key(params), content_hash(content))
+        with self._lock:
+            artifact = self._lru.get(key)
+            if artifact is not None:
+                self._lru.move_to_end(key)
+                return json.loads(artifact)
+
+            row = self._connection.execute(
+                "SELECT artifact FROM agent_artifacts "
+                "WHERE agent = ? AND prompt_version = ? AND params = ? AND content_hash = ?",
+                key
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return json.loads(row[0])
+
+    def put(self, agent: str, prompt_version: str, params: Dict[str, Any], content: str, artifact: Any,
+            chapter_id: str = None):
+        """Store an artifact; with a chapter id, the chapter's artifacts for older content are dropped"""
+        key = (agent, str(prompt_version), _params_key(params), content_hash(content))
+        serialized = json.dumps(artifact)
+        with self._lock:
+            if chapter_id is not None:
+                self._delete(
+                    "WHERE chapter_id = ? AND agent = ? AND content_hash != ?",
+                    (str(chapter_id), agent, key[3])
+                )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO agent_artifacts "
+                "(agent, prompt_version, params, content_hash, chapter_id, artifact, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, str(chapter_id) if chapter_id is not None else None, serialized, time.time())
+            )
+            if chapter_id is None:
+                self._delete(
+                    "WHERE rowid IN (SELECT rowid FROM agent_artifacts WHERE chapter_id IS NULL "
+                    "ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_unbound,)
+                )
+            self._connection.commit()
+            self._remember(key, serialized)
+
+    def invalidate_chapter(self, chapter_id: str) -> int:
+        """Drop every artifact stored for the chapter; returns the number removed"""
+        with self._lock:
+            removed = self._delete("WHERE chapter_id = ?", (str(chapter_id),))
+            self._connection.commit()
+        if removed:
+            logger.info(f"Invalidated {removed} agent artifacts for chapter {chapter_id}")
+        return removed
+
+    async def get_or_generate(self, agent: str, prompt_version: str, params: Dict[str, Any], content: str,
+                              generate: Callable[[], Awaitable[Any]], chapter_id: str = None) -> Any:
+        """Return the cached artifact, or await generate() and store its result"""
+        artifact = self.get(agent, prompt_version, params, content)
+        if artifact is not None:
+            return artifact
+        artifact = await generate()
+        self.put(agent, prompt_version, params, content, artifact, chapter_id)
+        return artifact
+
+    def _delete(self, where: str, args: Tuple) -> int:
+        """Delete the matching rows and their LRU entries; caller holds the lock and commits"""
+        rows = self._connection.execute(
+            f"SELECT agent, prompt_version, params, content_hash FROM agent_artifacts {where}", args
+        ).fetchall()
+        self._connection.executemany(
+            "DELETE FROM agent_artifacts WHERE agent = ? AND prompt_version = ? AND params = ? AND content_hash = ?",
+            rows
+        )
+        for row in rows:
+            self._lru.pop(tuple(row), None)
+        return len(rows)
+
+    def _remember(self, key: ArtifactKey, artifact: str):
+        self._lru[key] = artifact
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+
+# Global instance
+agent_artifact_cache = AgentArtifactCache()
@@ -26,6 +26,9 @@ class AuthService:
             email=user.email,
             name=user.name,
             background=user.background,
+            audience_type=user.audience_type,
+            complexity_level=user.complexity_level,
+            background_hash=user.background_hash,
             created_at=user.created_at,
             updated_at=user.updated_at
         )
@@ -45,6 +48,9 @@ class AuthService:
                 email=user.email,
                 name=user.name,
                 background=user.background,
+                audience_type=user.audience_type,
+                complexity_level=user.complexity_level,
+                background_hash=user.background_hash,
                 created_at=user.created_at,
                 updated_at=user.updated_at
             )
@@ -63,6 +69,9 @@ class AuthService:
                 email=user.email,
                 name=user.name,
                 background=user.background,
+                audience_type=user.audience_type,
+                complexity_level=user.complexity_level,
+                background_hash=user.background_hash,
                 created_at=user.created_at,
                 updated_at=user.updated_at
             )
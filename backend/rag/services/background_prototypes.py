@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Optional
+import threading
+import numpy as np
+from backend.rag.core.config import settings
+from backend.rag.services.embedding_service import embedding_service
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Complexity level served to each audience type
+AUDIENCE_COMPLEXITY = {
+    "beginner_student": "basic",
+    "intermediate_learner": "intermediate",
+    "advanced_practitioner": "advanced",
+    "researcher_academic": "advanced",
+}
+
+# Labeled example backgrounds; each audience type is represented by the centroid of its examples
+PROTOTYPES: Dict[str, List[str]] = {
+    "beginner_student": [
+        "I am a high school student curious about robots",
+        "Complete beginner with no programming or AI experience",
+        "First year undergraduate, just starting to learn about technology",
+        "I have never written code but want to understand how robots work",
+        "Hobbyist with no technical background, new to artificial intelligence",
+        "Non-technical reader interested in humanoid robots",
+    ],
+    "intermediate_learner": [
+        "I know some Python and have taken an introductory machine learning course",
+        "Computer science student who has built a few small projects",
+        "Software developer learning about robotics in my spare time",
+        "I have played with Arduino and Raspberry Pi and followed some online AI tutorials",
+        "Engineering undergraduate with basic knowledge of control systems and programming",
+        "Self-taught programmer with some exposure to neural networks",
+    ],
+    "advanced_practitioner": [
+        "Robotics engineer with several years of industry experience using ROS",
+        "I work professionally on perception and motion planning for autonomous robots",
+        "Senior machine learning engineer deploying models to production",
+        "Embedded systems engineer building control software for manipulators",
+        "I lead a team developing humanoid robot hardware and firmware",
+        "Professional developer working on computer vision and SLAM in industry",
+    ],
+    "researcher_academic": [
+        "PhD student researching reinforcement learning for legged locomotion",
+        "University professor teaching and publishing on robot learning",
+        "Postdoctoral researcher working on embodied AI",
+        "Academic researcher in human-robot interaction with peer-reviewed publications",
+        "Graduate student writing a thesis on imitation learning for manipulation",
+        "Research scientist at a lab studying foundation models for robotics",
+    ],
+}
+
+
+class PrototypeClassifier:
+    """Classifies a background by cosine similarity to labeled prototype centroids, no LLM involved"""
+
+    def __init__(self, prototypes: Dict[str, List[str]] = None):
+        self.prototypes = prototypes or PROTOTYPES
+        self.labels = list(self.prototypes)
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def centroids(self) -> np.ndarray:
+        """Unit-length centroid per label, embedded on first use"""
+        with self._lock:
+            if self._centroids is None:
+                rows = []
+                for label in self.labels:
+                    vectors = np.asarray(embedding_service.embed_texts(self.prototypes[label]), dtype=np.float32)
+                    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+                    centroid = vectors.mean(axis=0)
+                    rows.append(centroid / np.linalg.norm(centroid))
+                self._centroids = np.stack(rows)
+                logger.info(f"Embedded background prototypes for {len(self.labels)} audience types")
+            return self._centroids
+
+    def score(self, background: str) -> Dict[str, float]:
+        """Cosine similarity of background to every label's centroid"""
+        vector = np.asarray(embedding_service.embed_text(background), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return {label: 0.0 for label in self.labels}
+        similarities = self.centroids @ (vector / norm)
+        return {label: float(similarity) for label, similarity in zip(self.labels, similarities)}
+
+    def classify(self, background: str, min_similarity: float = None,
+                 min_margin: float = None) -> Optional[Dict[str, Any]]:
+        """Return the nearest label, or None when the match is too weak or too close to call"""
+        return self.classify_scores(self.score(background), min_similarity, min_margin)
+
+    def classify_scores(self, scores: Dict[str, float], min_similarity: float = None,
+                        min_margin: float = None) -> Optional[Dict[str, Any]]:
+        """classify() for already computed centroid similarities"""
+        if min_similarity is None:
+            min_similarity = settings.LOCAL_CLASSIFIER_MIN_SIMILARITY
+        if min_margin is None:
+            min_margin = settings.LOCAL_CLASSIFIER_MIN_MARGIN
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        (label, similarity), (_, runner_up) = ranked[0], ranked[1]
+        if similarity < min_similarity or similarity - runner_up < min_margin:
+            return None
+        return {
+            "audience_type": label,
+            "complexity_level": AUDIENCE_COMPLEXITY[label],
+            "confidence": round(similarity - runner_up, 4)
+        }
+
+
+# Global instance
+prototype_classifier = PrototypeClassifier()
@@ -0,0 +1,115 @@
+from typing import Any, Dict, List, Optional
+import asyncio
+import numpy as np
+from backend.rag.core.config import settings
+from backend.rag.services.embedding_service import embedding_service
+from backend.rag.services.vector_service import vector_service
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChapterContextService:
+    """Builds token-bounded agent context from a chapter's indexed chunks
+
+    Chunks are picked by maximal marginal relevance against the chapter centroid: each pick
+    favours chunks close to the chapter's overall topic (coverage) and penalizes similarity
+    to chunks already picked (diversity), until the token budget is spent.
+    """
+
+    def __init__(self, mmr_lambda: float = None):
+        self.mmr_lambda = settings.AGENT_MMR_LAMBDA if mmr_lambda is None else mmr_lambda
+
+    def select_chunks(self, chunks: List[Dict[str, Any]], token_budget: int) -> List[Dict[str, Any]]:
+        """Representative, non-redundant chunks fitting token_budget, in reading order"""
+        if not chunks:
+            return []
+
+        vectors = np.asarray([chunk["vector"] for chunk in chunks], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors /= norms
+        centroid = vectors.mean(axis=0)
+        centroid /= max(float(np.linalg.norm(centroid)), 1e-12)
+
+        relevance = vectors @ centroid
+        similarity = vectors @ vectors.T
+        tokens = [embedding_service.count_tokens(chunk["text"]) for chunk in chunks]
+
+        selected: List[int] = []
+        remaining = set(range(len(chunks)))
+        redundancy = np.zeros(len(chunks), dtype=np.float32)
+        used = 0
+        while remaining:
+            candidates = [index for index in remaining if used + tokens[index] <= token_budget]
+            if not candidates:
+                break
+            best = max(
+                candidates,
+                key=lambda index: self.mmr_lambda * relevance[index] - (1 - self.mmr_lambda) * redundancy[index]
+            )
+            selected.append(best)
+            remaining.discard(best)
+            used += tokens[best]
+            redundancy = np.maximum(redundancy, similarity[best])
+
+        if not selected:
+            # No whole chunk fits: keep the most central one, cut down to the budget
+            best = int(np.argmax(relevance))
+            return [{**chunks[best], "text": self._truncate(chunks[best]["text"], token_budget)}]
+
+        return sorted((chunks[index] for index in selected), key=lambda chunk: chunk["original_position"])
+
+    def _truncate(self, text: str, token_budget: int) -> str:
+        words = text.split()
+        while words and embedding_service.count_tokens(" ".join(words)) > token_budget:
+            # Shrink in proportion to the overshoot, at least one word at a time
+            excess = embedding_service.count_tokens(" ".join(words)) - token_budget
+            words = words[:-max(excess // 2, 1)]
+        return " ".join(words)
+
+    def format_context(self, chunks: List[Dict[str, Any]]) -> str:
+        """Join chunks into prompt text, repeating a heading only where it changes"""
+        parts = []
+        heading = None
+        for chunk in chunks:
+            if chunk.get("heading_hierarchy") and chunk["heading_hierarchy"] != heading:
+                heading = chunk["heading_hierarchy"]
+                parts.append(heading)
+            parts.append(chunk["text"])
+        return "\n\n".join(parts)
+
+    async def get_context(self, chapter_id: str, token_budget: int = None) -> Optional[str]:
+        """Context for a chapter within token_budget, or None when the chapter is not indexed"""
+        token_budget = token_budget or settings.AGENT_CONTEXT_TOKENS
+        loop = asyncio.get_running_loop()
+
+        def build() -> Optional[str]:
+            chunks = vector_service.get_chapter_chunks(str(chapter_id))
+            if not chunks:
+                return None
+            selected = self.select_chunks(chunks, token_budget)
+            logger.info(f"Selected {len(selected)} of {len(chunks)} chunks for chapter {chapter_id}")
+            context = self.format_context(selected)
+            return context if context.strip() else None
+
+        return await loop.run_in_executor(None, build)
+
+    async def resolve_content(self, chapter_content: Optional[str], chapter_id: Optional[str],
+                              token_budget: Optional[int]) -> str:
+        """Agent prompt content: retrieved context when a chapter id is given, else the full text
+
+        token_budget defaults to AGENT_CONTEXT_TOKENS.
+        """
+        if chapter_id is not None:
+            context = await self.get_context(chapter_id, token_budget)
+            if context is not None:
+                return context
+            logger.warning(f"Chapter {chapter_id} is not indexed, falling back to its full content")
+        if chapter_content is None:
+            raise ValueError("chapter_content is required when the chapter cannot be retrieved from the index")
+        return chapter_content
+
+
+# Global instance
+chapter_context_service = ChapterContextService()
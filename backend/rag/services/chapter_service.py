@@ -2,6 +2,10 @@ from typing import List, Optional
 from uuid import UUID, uuid4
 from datetime import datetime
 from backend.rag.models.chapter import Chapter, ChapterCreate, ChapterUpdate
+from backend.rag.services.chapter_translation_service import chapter_translation_service
+from backend.rag.services.personalization_service import personalization_service
+from backend.rag.services.agent_artifact_cache import agent_artifact_cache
+from backend.rag.services.markdown_tokenizer import content_hash
 from backend.rag.core.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -81,6 +85,8 @@ class ChapterService:
         )
         self.chapters.append(chapter)
         logger.info(f"Created chapter: {chapter.title} (ID: {chapter.id})")
+        self.schedule_translation(chapter)
+        personalization_service.schedule_chapter_variants(chapter.id, chapter.content)
         return chapter
 
     async def update_chapter(self, chapter_id: UUID, chapter_data: ChapterUpdate) -> Optional[Chapter]:
@@ -92,14 +98,31 @@ class ChapterService:
                 updated_chapter.updated_at = datetime.utcnow()
                 self.chapters[i] = updated_chapter
                 logger.info(f"Updated chapter: {updated_chapter.title} (ID: {updated_chapter.id})")
+                if 'content' in update_data:
+                    self.schedule_translation(updated_chapter)
+                    personalization_service.schedule_chapter_variants(updated_chapter.id, updated_chapter.content)
+                    agent_artifact_cache.invalidate_chapter(updated_chapter.id)
                 return updated_chapter
         return None
 
+    def schedule_translation(self, chapter: Chapter) -> bool:
+        """Queue a background Urdu translation of the chapter's current content"""
+        return chapter_translation_service.schedule(chapter.id, chapter.content, self._store_urdu_content)
+
+    def _store_urdu_content(self, chapter_id: str, translated_hash: str, urdu_content: str):
+        """Save a finished background translation if the chapter content has not changed since"""
+        for i, chapter in enumerate(self.chapters):
+            if str(chapter.id) == chapter_id and content_hash(chapter.content) == translated_hash:
+                self.chapters[i] = chapter.copy(update={'urdu_content': urdu_content})
+                logger.info(f"Stored Urdu translation for chapter: {chapter.title} (ID: {chapter.id})")
+                return
+
     async def delete_chapter(self, chapter_id: UUID) -> bool:
         """Delete a chapter"""
         for i, chapter in enumerate(self.chapters):
             if chapter.id == chapter_id:
                 del self.chapters[i]
+                agent_artifact_cache.invalidate_chapter(chapter_id)
                 logger.info(f"Deleted chapter with ID: {chapter_id}")
                 return True
         return False
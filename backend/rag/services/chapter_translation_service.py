@@ -0,0 +1,130 @@
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+import threading
+from backend.rag.core.config import settings
+from backend.rag.services.markdown_tokenizer import markdown_tokenizer, content_hash
+from backend.rag.services.translation_service import urdu_translation_service, TRANSLATION_ERROR_PREFIX
+from backend.rag.services.translation_executor import translation_executor, TranslationQueueFullError
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class ChapterTranslationService:
+    """Precomputes Urdu chapter translations in the background, keyed by content hash"""
+
+    def __init__(self):
+        # In-memory storage for demo purposes, like the chapter store itself
+        self.translations: Dict[str, Dict[str, Any]] = {}  # chapter id -> latest stored translation
+        # Section content hash -> Urdu section, LRU-bounded; only fully translated sections are kept
+        self.section_translations: "OrderedDict[str, str]" = OrderedDict()
+        self.pending: Dict[str, str] = {}  # chapter id -> content hash being translated
+        self.lock = threading.Lock()
+
+    def split_sections(self, content: str) -> List[str]:
+        """Split chapter content at headings; concatenating the sections yields the content again"""
+        return [content[start:end] for start, end, _ in markdown_tokenizer.section_spans(content)]
+
+    def schedule(self, chapter_id: str, content: str,
+                 on_complete: Optional[Callable[[str, str, str], None]] = None) -> bool:
+        """Queue a background translation unless this content is already stored or in progress
+
+        on_complete(chapter_id, content_hash, urdu_content) runs on the worker thread when done.
+        """
+        chapter_id = str(chapter_id)
+        hash_value = content_hash(content)
+        with self.lock:
+            stored = self.translations.get(chapter_id)
+            if stored and stored['content_hash'] == hash_value:
+                return False
+            if self.pending.get(chapter_id) == hash_value:
+                return False
+            self.pending[chapter_id] = hash_value
+
+        try:
+            # Shares the request workers and their admission bound
+            translation_executor.submit(self._translate_chapter, chapter_id, content, hash_value, on_complete)
+        except TranslationQueueFullError:
+            # Left stale; the next status check or edit schedules it again
+            logger.warning(f"Translation queue is full, not scheduling chapter {chapter_id}")
+            with self.lock:
+                if self.pending.get(chapter_id) == hash_value:
+                    del self.pending[chapter_id]
+            return False
+        logger.info(f"Scheduled Urdu translation for chapter {chapter_id}")
+        return True
+
+    def _translate_chapter(self, chapter_id: str, content: str, hash_value: str,
+                           on_complete: Optional[Callable[[str, str, str], None]]):
+        try:
+            urdu_content, translated_sections = self.translate_changed_sections(content)
+
+            with self.lock:
+                # A newer edit may have been scheduled meanwhile; never overwrite it with older content
+                is_latest = self.pending.get(chapter_id) == hash_value
+                if is_latest:
+                    del self.pending[chapter_id]
+                    self.translations[chapter_id] = {
+                        'content_hash': hash_value,
+                        'urdu_content': urdu_content,
+                        'translated_at': datetime.utcnow()
+                    }
+
+            logger.info(f"Translated chapter {chapter_id} ({translated_sections} changed sections)")
+            if is_latest and on_complete:
+                on_complete(chapter_id, hash_value, urdu_content)
+        except Exception as e:
+            logger.error(f"Background translation failed for chapter {chapter_id}: {e}")
+            with self.lock:
+                if self.pending.get(chapter_id) == hash_value:
+                    del self.pending[chapter_id]
+
+    def translate_changed_sections(self, content: str) -> Tuple[str, int]:
+        """Translate a chapter, reusing stored translations for sections whose content is unchanged"""
+        sections = self.split_sections(content)
+        hashes = [content_hash(section) for section in sections]
+
+        translated = []
+        changed = 0
+        for section, section_hash in zip(sections, hashes):
+            with self.lock:
+                urdu_section = self.section_translations.get(section_hash)
+                if urdu_section is not None:
+                    self.section_translations.move_to_end(section_hash)
+            if urdu_section is None:
+                urdu_section = urdu_translation_service.translate_content(section, preserve_formatting=True)
+                changed += 1
+                # Failed segments are retried on the next translation instead of being served forever
+                if TRANSLATION_ERROR_PREFIX not in urdu_section:
+                    self._remember_section(section_hash, urdu_section)
+            translated.append(urdu_section)
+
+        return "".join(translated), changed
+
+    def _remember_section(self, section_hash: str, urdu_section: str):
+        with self.lock:
+            self.section_translations[section_hash] = urdu_section
+            self.section_translations.move_to_end(section_hash)
+            while len(self.section_translations) > settings.CHAPTER_SECTION_CACHE_SIZE:
+                self.section_translations.popitem(last=False)
+
+    def get_status(self, chapter_id: str, content: str) -> Dict[str, Any]:
+        """Return the stored translation with its staleness relative to the current content"""
+        chapter_id = str(chapter_id)
+        hash_value = content_hash(content)
+        with self.lock:
+            stored = self.translations.get(chapter_id)
+            refresh_pending = chapter_id in self.pending
+
+        return {
+            'chapter_id': chapter_id,
+            'content_hash': hash_value,
+            'translated_content_hash': stored['content_hash'] if stored else None,
+            'urdu_content': stored['urdu_content'] if stored else None,
+            'translated_at': stored['translated_at'] if stored else None,
+            'stale': stored is None or stored['content_hash'] != hash_value,
+            'refresh_pending': refresh_pending
+        }
+
+# Global instance
+chapter_translation_service = ChapterTranslationService()
@@ -0,0 +1,172 @@
+from typing import Callable, Dict, Optional, Set, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import os
+import sqlite3
+import threading
+from backend.rag.core.config import settings
+from backend.rag.services.markdown_tokenizer import content_hash
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+COMPLEXITY_LEVELS = ("basic", "intermediate", "advanced")
+
+# adapt(content, level) -> personalized content
+Adapter = Callable[[str, str], str]
+
+
+class ChapterVariantStore:
+    """Personalized chapter variants keyed by (chapter id, level, content hash), in SQLite behind an LRU"""
+
+    def __init__(self, db_path: str = None, lru_size: int = 64):
+        self.db_path = db_path or settings.PERSONALIZATION_VARIANT_PATH
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[Tuple[str, str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chapter_variants (
+                chapter_id TEXT NOT NULL,
+                level TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                PRIMARY KEY (chapter_id, level, content_hash)
+            )
+            """
+        )
+        self._connection.commit()
+
+    def get(self, chapter_id: str, level: str, hash_value: str) -> Optional[str]:
+        key = (chapter_id, level, hash_value)
+        with self._lock:
+            variant = self._lru.get(key)
+            if variant is not None:
+                self._lru.move_to_end(key)
+                return variant
+
+            row = self._connection.execute(
+                "SELECT content FROM chapter_variants WHERE chapter_id = ? AND level = ? AND content_hash = ?",
+                key
+            ).fetchone()
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, chapter_id: str, level: str, hash_value: str, variant: str):
+        """Store a variant, dropping variants of older content for the same chapter and level"""
+        key = (chapter_id, level, hash_value)
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM chapter_variants WHERE chapter_id = ? AND level = ? AND content_hash != ?",
+                key
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO chapter_variants (chapter_id, level, content_hash, content) VALUES (?, ?, ?, ?)",
+                (*key, variant)
+            )
+            self._connection.commit()
+            self._remember(key, variant)
+
+    def _remember(self, key: Tuple[str, str, str], variant: str):
+        self._lru[key] = variant
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+
+class ChapterVariantService:
+    """Serves per-level personalized chapters (and sections) from the variant store, regenerating them in the background
+
+    Sections are stored under their own section ids, alongside whole chapters.
+    """
+
+    def __init__(self):
+        self.store = ChapterVariantStore()
+        self.pending: Dict[str, str] = {}  # chapter id -> content hash being regenerated
+        self.prefetching: Set[str] = set()  # "id:level" of single variants being generated
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.PERSONALIZATION_WORKERS,
+            thread_name_prefix="chapter-variants"
+        )
+
+    def get_variant(self, chapter_id: str, level: str, content: str, adapt: Adapter) -> Tuple[str, bool]:
+        """Return (variant, cached), adapting and storing the variant on a miss"""
+        chapter_id = str(chapter_id)
+        hash_value = content_hash(content)
+        variant = self.store.get(chapter_id, level, hash_value)
+        if variant is not None:
+            return variant, True
+
+        variant = adapt(content, level)
+        self.store.put(chapter_id, level, hash_value, variant)
+        return variant, False
+
+    def is_cached(self, chapter_id: str, level: str, content: str) -> bool:
+        return self.store.get(str(chapter_id), level, content_hash(content)) is not None
+
+    def prefetch(self, chapter_id: str, level: str, content: str, adapt: Adapter) -> bool:
+        """Generate one variant in the background unless it is stored or already being generated"""
+        chapter_id = str(chapter_id)
+        hash_value = content_hash(content)
+        key = f"{chapter_id}:{level}"
+        with self.lock:
+            if key in self.prefetching or self.store.get(chapter_id, level, hash_value) is not None:
+                return False
+            self.prefetching.add(key)
+
+        def generate():
+            try:
+                if self.store.get(chapter_id, level, hash_value) is None:
+                    self.store.put(chapter_id, level, hash_value, adapt(content, level))
+            except Exception as e:
+                logger.error(f"Prefetching {level} variant of {chapter_id} failed: {e}")
+            finally:
+                with self.lock:
+                    self.prefetching.discard(key)
+
+        self.executor.submit(generate)
+        return True
+
+    def schedule(self, chapter_id: str, content: str, adapt: Adapter) -> bool:
+        """Queue regeneration of every level's variant for the chapter's current content"""
+        chapter_id = str(chapter_id)
+        hash_value = content_hash(content)
+        with self.lock:
+            if self.pending.get(chapter_id) == hash_value:
+                return False
+            self.pending[chapter_id] = hash_value
+
+        logger.info(f"Scheduled personalized variants for chapter {chapter_id}")
+        self.executor.submit(self._regenerate, chapter_id, content, hash_value, adapt)
+        return True
+
+    def _regenerate(self, chapter_id: str, content: str, hash_value: str, adapt: Adapter):
+        try:
+            for level in COMPLEXITY_LEVELS:
+                if self.store.get(chapter_id, level, hash_value) is not None:
+                    continue
+                variant = adapt(content, level)
+                with self.lock:
+                    # A newer edit has been scheduled meanwhile; never replace its variants with older ones
+                    if self.pending.get(chapter_id) != hash_value:
+                        return
+                self.store.put(chapter_id, level, hash_value, variant)
+            logger.info(f"Regenerated personalized variants for chapter {chapter_id}")
+        except Exception as e:
+            logger.error(f"Personalized variant generation failed for chapter {chapter_id}: {e}")
+        finally:
+            with self.lock:
+                if self.pending.get(chapter_id) == hash_value:
+                    del self.pending[chapter_id]
+
+
+# Global instance
+chapter_variant_service = ChapterVariantService()
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from backend.rag.core.config import settings
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_whitespace_pattern = re.compile(r'\s+')
+
+
+def normalize_background(text: str) -> str:
+    """Normalize a background description so trivially different copies share one entry"""
+    return _whitespace_pattern.sub(" ", unicodedata.normalize("NFC", text or "")).strip().lower()
+
+
+def background_hash(text: str) -> str:
+    return hashlib.sha256(normalize_background(text).encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """Background classification cache: an in-process LRU in front of a local SQLite store"""
+
+    def __init__(self, db_path: str = None, lru_size: int = None):
+        self.db_path = db_path or settings.CLASSIFICATION_CACHE_PATH
+        self.lru_size = lru_size or settings.CLASSIFICATION_CACHE_LRU_SIZE
+        self._lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS background_classifications (
+                background_hash TEXT PRIMARY KEY,
+                background TEXT NOT NULL,
+                classification TEXT NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def get(self, background: str) -> Optional[Dict[str, Any]]:
+        """Cached classification for background, or None"""
+        key = background_hash(background)
+        with self._lock:
+            classification = self._lru.get(key)
+            if classification is not None:
+                self._lru.move_to_end(key)
+                return dict(classification)
+
+            row = self._connection.execute(
+                "SELECT classification FROM background_classifications WHERE background_hash = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            classification = json.loads(row[0])
+            self._remember(key, classification)
+            return dict(classification)
+
+    def put(self, background: str, classification: Dict[str, Any]):
+        """Store a classification in both tiers"""
+        key = background_hash(background)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO background_classifications (background_hash, background, classification) "
+                "VALUES (?, ?, ?)",
+                (key, normalize_background(background), json.dumps(classification))
+            )
+            self._connection.commit()
+            self._remember(key, dict(classification))
+
+    def _remember(self, key: str, classification: Dict[str, Any]):
+        self._lru[key] = classification
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+
+# Global instance
+classification_cache = ClassificationCache()
@@ -1,99 +1,176 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Tuple, Union
 import re
+from backend.rag.core.config import settings
+from backend.rag.services.markdown_tokenizer import markdown_tokenizer, iter_blocks, HEADING, CODE, TABLE
 from backend.rag.services.rag_service import RAGService
+from backend.rag.services.embedding_service import embedding_service
 
 
 class ContentProcessor:
     def __init__(self):
         self.rag_service = RAGService()
-
-    def chunk_textbook_content(self, content: str, chapter_id: str, max_chunk_size: int = 500) -> List[Dict[str, Any]]:
-        """Split textbook content into chunks for vector storage"""
-        # Split content by headings
-        heading_pattern = r'(^|\n)(#{1,6})\s+(.+?)(?=\n|$)'
-        parts = re.split(heading_pattern, content)
-
-        chunks = []
+        self.sentence_pattern = re.compile(r'(?<=[.!?])\s+')
+
+    def chunk_textbook_content(self, content: str, chapter_id: str, max_chunk_size: int = None,
+                               overlap: int = None) -> List[Dict[str, Any]]:
+        """Split textbook content into chunks for vector storage
+
+        max_chunk_size and overlap are measured in tokens of the embedding model's tokenizer.
+        """
+        return list(self.iter_chunks(content, chapter_id, max_chunk_size, overlap))
+
+    def iter_chunks(self, content: Union[str, Iterable[str]], chapter_id: str, max_chunk_tokens: int = None,
+                    overlap_tokens: int = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield token-bounded chunks from a chapter string or an iterable of lines
+
+        Chunks never cross a heading and never split a fenced code block or a table;
+        consecutive chunks in a section share up to overlap_tokens of trailing text.
+        """
+        if max_chunk_tokens is None:
+            max_chunk_tokens = settings.CHUNK_MAX_TOKENS
+        if overlap_tokens is None:
+            overlap_tokens = settings.CHUNK_OVERLAP_TOKENS
+        overlap_tokens = min(overlap_tokens, max_chunk_tokens // 2)
+
+        position = 0
         current_heading = ""
-        current_text = ""
-
-        i = 0
-        while i < len(parts):
-            part = parts[i]
-
-            # Check if this part is a heading
-            if part and part.startswith('#'):
-                # Save the previous chunk if it exists
-                if current_text.strip():
-                    chunks.extend(self._create_chunks_from_text(current_text, chapter_id, current_heading))
-
-                # Extract heading
-                if i + 2 < len(parts):
-                    current_heading = f"{parts[i]} {parts[i+2]}".strip()
-                    i += 3
-                else:
-                    current_heading = part.strip()
-                    i += 1
-                current_text = ""
+        current_units: List[Tuple[str, int, bool]] = []  # (text, tokens, atomic)
+        current_tokens = 0
+
+        for kind, text in self._iter_units(content):
+            if kind == "heading":
+                if current_units:
+                    yield self._make_chunk(current_units, chapter_id, current_heading, position)
+                    position += 1
+                current_heading = text
+                current_units, current_tokens = [], 0
+                continue
+
+            atomic = kind == "atomic"
+            # Oversized paragraphs are cut small enough to leave room for the overlap
+            pieces = [text] if atomic else self._split_oversized(text, max_chunk_tokens - overlap_tokens)
+            for piece in pieces:
+                piece_tokens = embedding_service.count_tokens(piece)
+
+                if current_units and current_tokens + piece_tokens > max_chunk_tokens:
+                    yield self._make_chunk(current_units, chapter_id, current_heading, position)
+                    position += 1
+                    current_units = self._overlap_tail(current_units, overlap_tokens)
+                    current_tokens = sum(tokens for _, tokens, _ in current_units)
+                    # Drop the overlap rather than push the next unit over the limit
+                    if current_tokens + piece_tokens > max_chunk_tokens:
+                        current_units, current_tokens = [], 0
+
+                current_units.append((piece, piece_tokens, atomic))
+                current_tokens += piece_tokens
+
+        if current_units:
+            yield self._make_chunk(current_units, chapter_id, current_heading, position)
+
+    def _iter_units(self, content: Union[str, Iterable[str]]) -> Iterator[Tuple[str, str]]:
+        """Yield ("heading" | "text" | "atomic", text) units from the shared markdown tokenizer"""
+        if isinstance(content, str):
+            blocks = markdown_tokenizer.tokenize(content)
+        else:
+            blocks = iter_blocks(content)
+
+        for block in blocks:
+            if block.kind == HEADING:
+                yield ("heading", f"{'#' * block.level} {block.heading_text}")
+            elif block.kind in (CODE, TABLE):
+                yield ("atomic", block.text)
             else:
-                current_text += part
-                i += 1
-
-        # Add the last chunk if it exists
-        if current_text.strip():
-            chunks.extend(self._create_chunks_from_text(current_text, chapter_id, current_heading))
-
-        return chunks
-
-    def _create_chunks_from_text(self, text: str, chapter_id: str, heading: str) -> List[Dict[str, Any]]:
-        """Create chunks from a section of text"""
-        chunks = []
-
-        # Split text into paragraphs
-        paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-
-        current_chunk = ""
-        for paragraph in paragraphs:
-            # Check if adding this paragraph would exceed chunk size
-            if len(current_chunk) + len(paragraph) > 500 and current_chunk:
-                # Save current chunk
-                chunks.append({
-                    'text': current_chunk.strip(),
-                    'chapter_id': chapter_id,
-                    'heading_hierarchy': heading,
-                    'position': len(chunks)
-                })
-                current_chunk = paragraph
-            else:
-                if current_chunk:
-                    current_chunk += "\n\n" + paragraph
-                else:
-                    current_chunk = paragraph
-
-        # Add the last chunk if it exists
-        if current_chunk.strip():
-            chunks.append({
-                'text': current_chunk.strip(),
-                'chapter_id': chapter_id,
-                'heading_hierarchy': heading,
-                'position': len(chunks)
-            })
-
-        return chunks
-
-    def process_and_store_chapters(self, chapters: List[Dict[str, Any]]):
+                yield ("text", block.text)
+
+    def _split_oversized(self, text: str, max_tokens: int) -> List[str]:
+        """Split a paragraph that exceeds max_tokens at sentence, then word, boundaries"""
+        if embedding_service.count_tokens(text) <= max_tokens:
+            return [text]
+
+        pieces = []
+        current = []
+        current_tokens = 0
+        for sentence in self.sentence_pattern.split(text):
+            sentence_tokens = embedding_service.count_tokens(sentence)
+            if sentence_tokens > max_tokens:
+                if current:
+                    pieces.append(" ".join(current))
+                    current, current_tokens = [], 0
+                pieces.extend(self._split_words(sentence, max_tokens))
+                continue
+            if current and current_tokens + sentence_tokens > max_tokens:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(sentence)
+            current_tokens += sentence_tokens
+
+        if current:
+            pieces.append(" ".join(current))
+        return pieces
+
+    def _split_words(self, text: str, max_tokens: int) -> List[str]:
+        """Split a run-on sentence into word windows that fit max_tokens"""
+        pieces = []
+        current = []
+        current_tokens = 0
+        for word in text.split():
+            # Per-word counts slightly over-estimate the joined count, which keeps windows within the limit
+            word_tokens = embedding_service.count_tokens(word)
+            if current and current_tokens + word_tokens > max_tokens:
+                pieces.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(word)
+            current_tokens += word_tokens
+        if current:
+            pieces.append(" ".join(current))
+        return pieces
+
+    def _overlap_tail(self, units: List[Tuple[str, int, bool]], overlap_tokens: int) -> List[Tuple[str, int, bool]]:
+        """Take trailing text of the previous chunk, up to overlap_tokens, to start the next one"""
+        if overlap_tokens <= 0:
+            return []
+
+        tail: List[Tuple[str, int, bool]] = []
+        tail_tokens = 0
+        for text, tokens, atomic in reversed(units):
+            if atomic:
+                # Code blocks and tables are never duplicated into the overlap
+                break
+            if tail_tokens + tokens <= overlap_tokens:
+                tail.insert(0, (text, tokens, atomic))
+                tail_tokens += tokens
+                continue
+
+            # Take the trailing words of the unit that straddles the overlap boundary
+            words = text.split()
+            count = min(len(words), overlap_tokens - tail_tokens)
+            while count > 0:
+                partial = " ".join(words[-count:])
+                partial_tokens = embedding_service.count_tokens(partial)
+                if tail_tokens + partial_tokens <= overlap_tokens:
+                    tail.insert(0, (partial, partial_tokens, False))
+                    break
+                count -= 1
+            break
+
+        return tail
+
+    def _make_chunk(self, units: List[Tuple[str, int, bool]], chapter_id: str, heading: str,
+                    position: int) -> Dict[str, Any]:
+        return {
+            'text': "\n\n".join(text for text, _, _ in units).strip(),
+            'chapter_id': chapter_id,
+            'heading_hierarchy': heading,
+            'position': position
+        }
+
+    def process_and_store_chapters(self, chapters: Iterable[Dict[str, Any]]):
         """Process and store all chapters in the vector database"""
-        all_chunks = []
-
-        for chapter in chapters:
-            chapter_id = chapter['id']
-            content = chapter['content']
-
-            # Chunk the content
-            chunks = self.chunk_textbook_content(content, chapter_id)
-            all_chunks.extend(chunks)
-
-        # Add all chunks to the RAG system
-        self.rag_service.add_document_chunks(all_chunks)
-
-        return len(all_chunks)
\ No newline at end of file
+        # Chunks stream straight into batched embedding, so no chapter is held as a full chunk list
+        chunk_stream = (
+            chunk
+            for chapter in chapters
+            for chunk in self.iter_chunks(chapter['content'], chapter['id'])
+        )
+
+        return self.rag_service.add_document_chunks(chunk_stream)
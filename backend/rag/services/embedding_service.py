@@ -48,6 +48,13 @@ class EmbeddingService:
 
         return result
 
+    def count_tokens(self, text: str) -> int:
+        """Count tokens as the embedding model's tokenizer sees them"""
+        tokenizer = getattr(self.model, "tokenizer", None)
+        if tokenizer is None:
+            return len(text.split())
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
     def embed_query(self, query: str) -> List[float]:
         """Generate embedding for a query (same as text but semantically different usage)"""
         return self.embed_text(query)
@@ -0,0 +1,43 @@
+from typing import Dict, Optional, Tuple
+from uuid import UUID, uuid4
+from datetime import datetime
+from backend.rag.models.chapter import ChapterInteraction
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class InteractionService:
+    def __init__(self):
+        # In-memory storage for demo purposes, mirroring the chapter_interactions table
+        # In production, this would connect to a database
+        self.interactions: Dict[Tuple[UUID, UUID], ChapterInteraction] = {}
+
+    async def get_interaction(self, user_id: UUID, chapter_id: UUID) -> Optional[ChapterInteraction]:
+        """Get a user's interaction record for a chapter"""
+        return self.interactions.get((user_id, chapter_id))
+
+    async def save_personalized_content(self, user_id: UUID, chapter_id: UUID,
+                                        personalized_content: str) -> ChapterInteraction:
+        """Record the personalized chapter served to a user, creating the interaction if needed"""
+        now = datetime.utcnow()
+        interaction = self.interactions.get((user_id, chapter_id))
+        if interaction is None:
+            interaction = ChapterInteraction(
+                id=uuid4(),
+                user_id=user_id,
+                chapter_id=chapter_id,
+                created_at=now
+            )
+
+        if interaction.personalized_content != personalized_content:
+            logger.info(f"Stored personalized content for user {user_id}, chapter {chapter_id}")
+        interaction = interaction.copy(update={
+            'personalized_content': personalized_content,
+            'last_accessed': now,
+            'updated_at': now
+        })
+        self.interactions[(user_id, chapter_id)] = interaction
+        return interaction
+
+# Global instance
+interaction_service = InteractionService()
@@ -1,145 +1,99 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Tuple
 import re
+from backend.rag.services.markdown_tokenizer import markdown_tokenizer, HEADING, CODE, TABLE, LIST
+
+
+class Segment(NamedTuple):
+    """A span of source text that is either protected markdown or translatable prose"""
+    protected: bool
+    text: str
+    kind: str = "text"
 
 
 class MarkdownPreserver:
     """Preserves markdown formatting during translation processes"""
 
     def __init__(self):
-        self.placeholder_pattern = r'\[PLACEHOLDER_(\d+)\]'
-        self.placeholders = {}
+        self.placeholder_pattern = re.compile(r'\[PLACEHOLDER_[A-Z_]+_\d+\]')
+        # One alternation scanned left to right; at a given position earlier alternatives win
+        self.protected_pattern = re.compile(
+            r'(?P<CODE>```.*?```)'
+            r'|(?P<INLINE_CODE>`[^`]*`)'
+            r'|(?P<IMAGE>!\[[^\]]*\]\([^)]+\))'
+            r'|(?P<LINK>\[[^\]]+\]\([^)]+\))'
+            r'|(?P<HEADING>^#+[ \t][^\n]*)'
+            r'|(?P<LIST>^[ \t]*[-*+][ \t][^\n]*)'
+            r'|(?P<BOLD>\*\*[^*]+\*\*)'
+            r'|(?P<ITALIC>\*[^*]+\*)',
+            re.MULTILINE | re.DOTALL
+        )
+
+    def segment(self, content: str) -> List[Segment]:
+        """Split content in a single pass into protected markdown and translatable text segments"""
+        segments = []
+        position = 0
+        for match in self.protected_pattern.finditer(content):
+            if match.start() > position:
+                segments.append(Segment(False, content[position:match.start()]))
+            segments.append(Segment(True, match.group(), match.lastgroup))
+            position = match.end()
+        if position < len(content):
+            segments.append(Segment(False, content[position:]))
+        return segments
 
     def extract_and_preserve_formatting(self, content: str) -> Tuple[str, Dict[str, str]]:
-        """Extract markdown elements and replace with placeholders"""
-        processed_content = content
-        self.placeholders = {}
-
-        # Extract and preserve code blocks
-        code_blocks = re.findall(r'```.*?```', processed_content, re.DOTALL)
-        for i, block in enumerate(code_blocks):
-            placeholder = f"[PLACEHOLDER_CODE_{i}]"
-            self.placeholders[placeholder] = block
-            processed_content = processed_content.replace(block, placeholder, 1)
-
-        # Extract and preserve inline code
-        inline_codes = re.findall(r'`[^`]*`', processed_content)
-        for i, code in enumerate(inline_codes):
-            placeholder = f"[PLACEHOLDER_INLINE_CODE_{len(code_blocks) + i}]"
-            self.placeholders[placeholder] = code
-            processed_content = processed_content.replace(code, placeholder, 1)
-
-        # Extract and preserve links
-        links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', processed_content)
-        for i, (text, url) in enumerate(links):
-            placeholder = f"[PLACEHOLDER_LINK_{i}]"
-            self.placeholders[placeholder] = f"[{text}]({url})"
-            processed_content = processed_content.replace(f"[{text}]({url})", placeholder, 1)
-
-        # Extract and preserve images
-        images = re.findall(r'!\[([^\]]*)\]\(([^)]+)\)', processed_content)
-        for i, (alt, src) in enumerate(images):
-            placeholder = f"[PLACEHOLDER_IMAGE_{i}]"
-            self.placeholders[placeholder] = f"![{alt}]({src})"
-            processed_content = processed_content.replace(f"![{alt}]({src})", placeholder, 1)
-
-        # Extract and preserve headings
-        headings = re.findall(r'^(#+\s.*?)(?=\n|$)', processed_content, re.MULTILINE)
-        for i, heading in enumerate(headings):
-            placeholder = f"[PLACEHOLDER_HEADING_{i}]"
-            self.placeholders[placeholder] = heading
-            processed_content = processed_content.replace(heading, placeholder, 1)
-
-        # Extract and preserve bold text
-        bolds = re.findall(r'\*\*([^*]+)\*\*', processed_content)
-        for i, bold in enumerate(bolds):
-            placeholder = f"[PLACEHOLDER_BOLD_{i}]"
-            self.placeholders[placeholder] = f"**{bold}**"
-            processed_content = processed_content.replace(f"**{bold}**", placeholder, 1)
-
-        # Extract and preserve italic text
-        italics = re.findall(r'\*([^*]+)\*', processed_content)
-        for i, italic in enumerate(italics):
-            placeholder = f"[PLACEHOLDER_ITALIC_{i}]"
-            self.placeholders[placeholder] = f"*{italic}*"
-            processed_content = processed_content.replace(f"*{italic}*", placeholder, 1)
-
-        # Extract and preserve lists
-        list_items = re.findall(r'^(\s*[-*+]\s.*?)(?=\n\s*[-*+]\s|\n\n|\Z)', processed_content, re.MULTILINE)
-        for i, item in enumerate(list_items):
-            placeholder = f"[PLACEHOLDER_LIST_{i}]"
-            self.placeholders[placeholder] = item
-            processed_content = processed_content.replace(item, placeholder, 1)
-
-        return processed_content, self.placeholders
-
-    def restore_formatting(self, translated_content: str) -> str:
-        """Restore markdown formatting from placeholders"""
-        restored_content = translated_content
+        """Extract markdown elements and replace with placeholders
+
+        All state lives in the returned mapping, so concurrent calls never interfere.
+        """
+        placeholders = {}
+        counters: Dict[str, int] = {}
+        parts = []
+        for segment in self.segment(content):
+            if not segment.protected:
+                parts.append(segment.text)
+                continue
+            index = counters.get(segment.kind, 0)
+            counters[segment.kind] = index + 1
+            placeholder = f"[PLACEHOLDER_{segment.kind}_{index}]"
+            placeholders[placeholder] = segment.text
+            parts.append(placeholder)
 
-        # Replace placeholders with original markdown elements
-        for placeholder, original in self.placeholders.items():
-            restored_content = restored_content.replace(placeholder, original)
+        return "".join(parts), placeholders
 
-        return restored_content
+    def restore_formatting(self, translated_content: str, placeholders: Dict[str, str]) -> str:
+        """Restore markdown formatting from placeholders"""
+        # A single scan over the translation, substituting every placeholder as it is found
+        return self.placeholder_pattern.sub(
+            lambda match: placeholders.get(match.group(), match.group()),
+            translated_content
+        )
 
     def parse_markdown_blocks(self, content: str) -> List[Dict[str, str]]:
         """Parse markdown into structured blocks"""
         blocks = []
-        lines = content.split('\n')
+        tokens = markdown_tokenizer.tokenize(content)
+        blank_runs = markdown_tokenizer.blank_line_runs(content, tokens)
 
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
+        for token, blank_lines in zip(tokens, blank_runs):
+            blocks.extend({'type': 'empty', 'content': ''} for _ in range(blank_lines))
 
-            if not line:
-                blocks.append({'type': 'empty', 'content': line})
-                i += 1
-                continue
-
-            # Check for headings
-            if line.startswith('#'):
-                level = len(line) - len(line.lstrip('#'))
-                content = line.lstrip('# ').strip()
+            if token.kind == HEADING:
                 blocks.append({
                     'type': 'heading',
-                    'level': level,
-                    'content': content
-                })
-                i += 1
-                continue
-
-            # Check for code blocks
-            if line.startswith('```'):
-                code_block = [line]
-                i += 1
-                while i < len(lines) and not lines[i].strip().startswith('```'):
-                    code_block.append(lines[i])
-                    i += 1
-                if i < len(lines):
-                    code_block.append(lines[i])  # Add closing ```
-                blocks.append({
-                    'type': 'code_block',
-                    'content': '\n'.join(code_block)
+                    'level': token.level,
+                    'content': token.heading_text
                 })
-                i += 1
-                continue
-
-            # Check for list items
-            if line.startswith(('- ', '* ', '+ ')) or re.match(r'^\d+\.\s', line):
-                blocks.append({
-                    'type': 'list_item',
-                    'content': line
-                })
-                i += 1
-                continue
-
-            # Regular paragraph
-            blocks.append({
-                'type': 'paragraph',
-                'content': line
-            })
-            i += 1
+            elif token.kind == CODE:
+                blocks.append({'type': 'code_block', 'content': token.text})
+            elif token.kind == TABLE:
+                blocks.append({'type': 'table', 'content': token.text})
+            elif token.kind == LIST:
+                blocks.extend({'type': 'list_item', 'content': line.strip()} for line in token.text.split('\n'))
+            else:
+                blocks.extend({'type': 'paragraph', 'content': line.strip()} for line in token.text.split('\n'))
 
+        blocks.extend({'type': 'empty', 'content': ''} for _ in range(blank_runs[-1]))
         return blocks
 
     def reconstruct_markdown(self, blocks: List[Dict[str, str]]) -> str:
@@ -149,7 +103,7 @@ class MarkdownPreserver:
         for block in blocks:
             if block['type'] == 'heading':
                 result_lines.append(f"{'#' * block['level']} {block['content']}")
-            elif block['type'] == 'code_block':
+            elif block['type'] in ('code_block', 'table'):
                 result_lines.append(block['content'])
             elif block['type'] == 'list_item':
                 result_lines.append(block['content'])
@@ -177,7 +131,7 @@ class UrduTranslationService:
         translated_content = f"URDU TRANSLATION: {clean_content}"
 
         # Restore the formatting
-        final_content = self.markdown_preserver.restore_formatting(translated_content)
+        final_content = self.markdown_preserver.restore_formatting(translated_content, placeholders)
 
         return final_content
 
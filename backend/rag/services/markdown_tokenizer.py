@@ -0,0 +1,174 @@
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import io
+import re
+import threading
+
+HEADING = "heading"
+CODE = "code"
+LIST = "list"
+TABLE = "table"
+PARAGRAPH = "paragraph"
+
+_heading_pattern = re.compile(r'(#{1,6})(?:[ \t]|$)')
+_list_item_pattern = re.compile(r'[ \t]*(?:[-*+]|\d+[.)])[ \t]')
+
+
+class MarkdownBlock(NamedTuple):
+    """One block-level markdown element and its [start, end) character offsets in the source"""
+    kind: str
+    start: int
+    end: int
+    level: int  # heading level, 0 for other blocks
+    text: str
+
+    @property
+    def heading_text(self) -> str:
+        return self.text.lstrip('#').strip()
+
+
+def content_hash(content: str) -> str:
+    """Stable hash of chapter content, used as a cache key"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[MarkdownBlock]:
+    """Scan markdown lines once, yielding blocks in document order
+
+    Lines must keep their trailing newlines (as produced by iterating a file or StringIO)
+    so that offsets refer to the original text. Runs in time linear in the input.
+    """
+    kind = None
+    level = 0
+    fence = ""
+    start = 0
+    end = 0
+    buffer: List[str] = []
+    offset = 0
+
+    def flush() -> MarkdownBlock:
+        return MarkdownBlock(kind, start, end, level, "\n".join(buffer))
+
+    for raw_line in lines:
+        line = raw_line.rstrip("\r\n")
+        line_start = offset
+        line_end = offset + len(line)
+        offset += len(raw_line)
+        stripped = line.strip()
+
+        if kind == CODE:
+            buffer.append(line)
+            end = line_end
+            if stripped.startswith(fence):
+                yield flush()
+                kind, buffer = None, []
+            continue
+
+        if not stripped:
+            if kind is not None:
+                yield flush()
+                kind, buffer = None, []
+            continue
+
+        if kind == TABLE and stripped.startswith("|"):
+            buffer.append(line)
+            end = line_end
+            continue
+        if kind == LIST and (_list_item_pattern.match(line) or line[:1] in (" ", "\t")):
+            buffer.append(line)
+            end = line_end
+            continue
+
+        heading = _heading_pattern.match(line)
+        if stripped.startswith(("```", "~~~")):
+            new_kind = CODE
+        elif heading:
+            new_kind = HEADING
+        elif stripped.startswith("|"):
+            new_kind = TABLE
+        elif _list_item_pattern.match(line):
+            new_kind = LIST
+        else:
+            new_kind = PARAGRAPH
+
+        if kind == PARAGRAPH and new_kind == PARAGRAPH:
+            buffer.append(line)
+            end = line_end
+            continue
+
+        if kind is not None:
+            yield flush()
+
+        kind, start, end, buffer = new_kind, line_start, line_end, [line]
+        level = len(heading.group(1)) if new_kind == HEADING else 0
+        if new_kind == CODE:
+            fence = stripped[:3]
+        elif new_kind == HEADING:
+            yield flush()
+            kind, buffer = None, []
+
+    # An unterminated code block still becomes a single block
+    if kind is not None:
+        yield flush()
+
+
+class MarkdownTokenizer:
+    """Shared markdown block tokenizer, memoized per content hash"""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[MarkdownBlock, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def tokenize(self, content: str) -> Tuple[MarkdownBlock, ...]:
+        """Return the block list for content, parsing it at most once per distinct content"""
+        key = content_hash(content)
+        with self._lock:
+            blocks = self._cache.get(key)
+            if blocks is not None:
+                self._cache.move_to_end(key)
+                return blocks
+
+        blocks = tuple(iter_blocks(io.StringIO(content)))
+
+        with self._lock:
+            self._cache[key] = blocks
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return blocks
+
+    def section_spans(self, content: str) -> List[Tuple[int, int, Optional[str]]]:
+        """(start, end, heading text) of each heading section; together the spans cover content
+
+        Text before the first heading is its own span, with heading text None. Every consumer
+        splitting chapters into sections goes through here so their boundaries agree.
+        """
+        titles = {block.start: block.heading_text for block in self.tokenize(content) if block.kind == HEADING}
+        starts = [0] + sorted(start for start in titles if start > 0)
+        ends = starts[1:] + [len(content)]
+        return [(start, end, titles.get(start)) for start, end in zip(starts, ends)]
+
+    def blank_line_runs(self, content: str, blocks: Tuple[MarkdownBlock, ...]) -> List[int]:
+        """Blank lines before each block, followed by the number of lines after the last block
+
+        Lets line-oriented consumers rebuild the exact vertical spacing of the source.
+        """
+        if not blocks:
+            return [content.count("\n") + 1]
+
+        runs = [content.count("\n", 0, blocks[0].start)]
+        for previous, block in zip(blocks, blocks[1:]):
+            # The first newline after a block only terminates that block's last line
+            runs.append(content.count("\n", previous.end, block.start) - 1)
+        runs.append(content.count("\n", blocks[-1].end))
+        return runs
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+# Global instance
+markdown_tokenizer = MarkdownTokenizer()
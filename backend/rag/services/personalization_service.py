@@ -1,18 +1,63 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from uuid import UUID
 from backend.shared.types import PersonalizationRequest
-from openai import OpenAI
-import os
-import json
+from backend.rag.models.user import User
+from backend.rag.models.chapter import Chapter
+from backend.rag.services.classification_cache import classification_cache, background_hash
+from backend.rag.services.user_service import user_service
+from backend.rag.services.background_prototypes import prototype_classifier, AUDIENCE_COMPLEXITY
+from backend.rag.services.chapter_variant_service import chapter_variant_service, COMPLEXITY_LEVELS
+from backend.rag.services.interaction_service import interaction_service
+from backend.rag.services.section_service import section_service
+from backend.rag.core.config import settings
+from backend.rag.core.logging_config import get_logger
+from backend.rag.core.llm_gateway import llm_gateway
+from backend.rag.core.llm_scheduler import PERSONALIZATION
+import asyncio
+
+logger = get_logger(__name__)
 
 
 class BackgroundClassifier:
     """Classifies user background into categories for personalization"""
 
-    def __init__(self):
-        self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
     def classify(self, background_input: str) -> Dict[str, Any]:
-        """Classify user background into categories"""
+        """Classify user background into categories, memoized per normalized background text
+
+        Blocks on the LLM for ambiguous backgrounds; async code should use classify_async.
+        """
+        cached = self._cached(background_input)
+        if cached is not None:
+            return cached
+
+        classification = self._classify_locally(background_input)
+        if classification is None:
+            classification = llm_gateway.chat_json_sync(
+                self._classification_messages(background_input), priority=PERSONALIZATION
+            )
+            classification = self._validated(classification)
+        classification_cache.put(background_input, classification)
+        return classification
+
+    async def classify_async(self, background_input: str) -> Dict[str, Any]:
+        """Classify user background without blocking the event loop on the embedding model or the LLM"""
+        cached = self._cached(background_input)
+        if cached is not None:
+            return cached
+
+        # The prototype classifier runs a SentenceTransformer forward pass
+        loop = asyncio.get_running_loop()
+        classification = await loop.run_in_executor(None, self._classify_locally, background_input)
+        if classification is None:
+            classification = await llm_gateway.chat_json(
+                self._classification_messages(background_input), priority=PERSONALIZATION
+            )
+            classification = self._validated(classification)
+        classification_cache.put(background_input, classification)
+        return classification
+
+    def _classify_locally(self, background_input: str) -> Optional[Dict[str, Any]]:
+        """Classification from keywords or prototype centroids, or None when the LLM is needed"""
         if not background_input or background_input.strip().lower() in ['beginner', 'intermediate', 'advanced', 'researcher', 'student', 'practitioner']:
             # If the input is already a recognized category, return a basic classification
             if 'beginner' in background_input.lower() or 'student' in background_input.lower():
@@ -24,6 +69,36 @@ class BackgroundClassifier:
             else:
                 return {"audience_type": "intermediate_learner", "complexity_level": "intermediate"}
 
+        if settings.LOCAL_CLASSIFIER_ENABLED:
+            # Nearest prototype centroid; only ambiguous backgrounds go on to the LLM
+            classification = prototype_classifier.classify(background_input)
+            if classification is not None:
+                return classification
+            logger.info("Background is ambiguous for the local classifier, asking the LLM")
+        return None
+
+    def _cached(self, background_input: str) -> Optional[Dict[str, Any]]:
+        """Cached classification, ignoring entries stored before replies were validated"""
+        cached = classification_cache.get(background_input)
+        if cached is None:
+            return None
+        try:
+            return {**cached, **self._validated(cached)}
+        except ValueError:
+            logger.warning("Ignoring malformed cached background classification")
+            return None
+
+    def _validated(self, classification: Any) -> Dict[str, Any]:
+        """Check an LLM classification before it is cached; raises ValueError for malformed replies"""
+        if not isinstance(classification, dict) or classification.get("audience_type") not in AUDIENCE_COMPLEXITY:
+            raise ValueError(f"Unexpected background classification: {classification!r}")
+        audience_type = classification["audience_type"]
+        complexity_level = classification.get("complexity_level")
+        if complexity_level not in COMPLEXITY_LEVELS:
+            complexity_level = AUDIENCE_COMPLEXITY[audience_type]
+        return {"audience_type": audience_type, "complexity_level": complexity_level}
+
+    def _classification_messages(self, background_input: str) -> List[Dict[str, str]]:
         classification_prompt = f"""
         Classify the following user background into one of these categories:
         - 'beginner_student': New to AI/robotics, basic education
@@ -36,13 +111,7 @@ class BackgroundClassifier:
         Respond with JSON format: {{"audience_type": "...", "complexity_level": "basic|intermediate|advanced"}}
         """
 
-        response = self.openai_client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": classification_prompt}],
-            response_format={"type": "json_object"}
-        )
-
-        return json.loads(response.choices[0].message.content)
+        return [{"role": "user", "content": classification_prompt}]
 
 
 class ContentAdaptor:
@@ -103,6 +172,14 @@ class ContentAdaptor:
         return f"**Advanced Technical Version:**\n\n{content}\n\n*This content has been expanded with technical depth, advanced concepts, and references to current research.*"
 
 
+# Audience each complexity level's shared chapter variant is written for
+LEVEL_AUDIENCES = {
+    "basic": "beginner_student",
+    "intermediate": "intermediate_learner",
+    "advanced": "advanced_practitioner",
+}
+
+
 class PersonalizationService:
     def __init__(self):
         self.background_classifier = BackgroundClassifier()
@@ -121,18 +198,174 @@ class PersonalizationService:
 
         return adapted_content
 
+    async def personalize_batch(self, items: List[str], user_background: str) -> Dict[str, Any]:
+        """Adapt many fragments for one background: classify once, then adapt concurrently
+
+        Results keep the order of items; a failed item carries its error instead of content.
+        """
+        loop = asyncio.get_running_loop()
+        background_profile = await self.background_classifier.classify_async(user_background)
+        semaphore = asyncio.Semaphore(settings.PERSONALIZATION_BATCH_CONCURRENCY)
+
+        async def adapt(index: int, content: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    adapted_content = await loop.run_in_executor(
+                        None,
+                        self.content_adaptor.adjust_content,
+                        content,
+                        background_profile["audience_type"],
+                        background_profile["complexity_level"]
+                    )
+                    return {"index": index, "adapted_content": adapted_content}
+                except Exception as e:
+                    logger.error(f"Adapting batch item {index} failed: {e}")
+                    return {"index": index, "error": str(e)}
+
+        results = await asyncio.gather(*(adapt(i, content) for i, content in enumerate(items)))
+        return {
+            "audience_type": background_profile["audience_type"],
+            "complexity_level": background_profile["complexity_level"],
+            "results": results,
+            "failed": sum(1 for result in results if "error" in result)
+        }
+
+    async def personalize_content_async(self, content: str, user_background: str) -> str:
+        """Adapt content without blocking the event loop on background classification"""
+        background_profile = await self.background_classifier.classify_async(user_background)
+        return self.content_adaptor.adjust_content(
+            original_content=content,
+            target_audience=background_profile["audience_type"],
+            preferred_complexity=background_profile["complexity_level"]
+        )
+
     def classify_user_background(self, background_input: str) -> Dict[str, Any]:
         """Classify user background into categories"""
         return self.background_classifier.classify(background_input)
 
+    async def classify_user_background_async(self, background_input: str) -> Dict[str, Any]:
+        return await self.background_classifier.classify_async(background_input)
+
+    async def classify_for_user(self, user: User) -> Dict[str, Any]:
+        """Classification of a user's background, read from the profile while the background is unchanged
+
+        A fresh classification is stored back on the profile whenever the background has changed.
+        """
+        hash_value = background_hash(user.background or "")
+        if user.background_hash == hash_value and user.complexity_level:
+            return {"audience_type": user.audience_type, "complexity_level": user.complexity_level}
+
+        classification = await self.background_classifier.classify_async(user.background or "")
+        await user_service.update_user(
+            user.id,
+            audience_type=classification["audience_type"],
+            complexity_level=classification["complexity_level"],
+            background_hash=hash_value
+        )
+        return classification
+
+    def adapt_for_level(self, content: str, level: str) -> str:
+        """Adapt content for a complexity level; chapter variants are generated through this"""
+        return self.content_adaptor.adjust_content(
+            original_content=content,
+            target_audience=LEVEL_AUDIENCES[level],
+            preferred_complexity=level
+        )
+
+    def schedule_chapter_variants(self, chapter_id: str, content: str) -> bool:
+        """Regenerate every level's variant of a chapter in the background"""
+        return chapter_variant_service.schedule(chapter_id, content, self.adapt_for_level)
+
     def get_personalized_chapter(self, chapter_content: str, user_background: str, chapter_id: str = None) -> Dict[str, Any]:
         """Get a personalized version of a chapter"""
-        personalized_content = self.personalize_content(chapter_content, user_background)
+        background_profile = self.background_classifier.classify(user_background)
+        level = self._level(background_profile)
+
+        cached = False
+        if chapter_id is not None:
+            # Chapters have one variant per complexity level, so reads are store lookups
+            personalized_content, cached = chapter_variant_service.get_variant(
+                chapter_id, level, chapter_content, self.adapt_for_level
+            )
+        else:
+            personalized_content = self.adapt_for_level(chapter_content, level)
 
         return {
             "chapter_id": chapter_id,
             "original_content": chapter_content,
             "personalized_content": personalized_content,
             "user_background": user_background,
+            "complexity_level": level,
+            "cached": cached,
             "personalization_applied": True
-        }
\ No newline at end of file
+        }
+
+    async def get_personalized_chapter_for_user(self, user: User, chapter_id, chapter_content: str) -> Dict[str, Any]:
+        """Personalized chapter for a signed-in user, recorded in the user's chapter interaction"""
+        level = self._level(await self.classify_for_user(user))
+        personalized_content, cached = chapter_variant_service.get_variant(
+            chapter_id, level, chapter_content, self.adapt_for_level
+        )
+        await interaction_service.save_personalized_content(user.id, chapter_id, personalized_content)
+
+        return {
+            "chapter_id": chapter_id,
+            "personalized_content": personalized_content,
+            "complexity_level": level,
+            "cached": cached,
+            "personalization_applied": True
+        }
+
+    async def get_section_statuses(self, user: User, chapter: Chapter) -> Dict[str, Any]:
+        """List a chapter's sections with whether each is already adapted for the user's level"""
+        level = self._level(await self.classify_for_user(user))
+        sections = section_service.get_sections(chapter)
+        return {
+            "chapter_id": chapter.id,
+            "complexity_level": level,
+            "sections": [
+                {
+                    "section_id": section.id,
+                    "order_index": section.order_index,
+                    "title": section.title,
+                    "cached": chapter_variant_service.is_cached(section.id, level, section.content)
+                }
+                for section in sections
+            ]
+        }
+
+    async def get_personalized_section(self, user: User, chapter: Chapter, section_id: UUID) -> Optional[Dict[str, Any]]:
+        """Adapt one section for the user's level and prefetch the next one in the background"""
+        sections = section_service.get_sections(chapter)
+        position = next((i for i, section in enumerate(sections) if section.id == section_id), None)
+        if position is None:
+            return None
+
+        level = self._level(await self.classify_for_user(user))
+        section = sections[position]
+        personalized_content, cached = chapter_variant_service.get_variant(
+            section.id, level, section.content, self.adapt_for_level
+        )
+
+        next_section = sections[position + 1] if position + 1 < len(sections) else None
+        if next_section is not None:
+            chapter_variant_service.prefetch(next_section.id, level, next_section.content, self.adapt_for_level)
+
+        return {
+            "chapter_id": chapter.id,
+            "section_id": section.id,
+            "order_index": section.order_index,
+            "title": section.title,
+            "personalized_content": personalized_content,
+            "complexity_level": level,
+            "cached": cached,
+            "next_section_id": next_section.id if next_section else None,
+            "total_sections": len(sections)
+        }
+
+    def _level(self, background_profile: Dict[str, Any]) -> str:
+        level = background_profile.get("complexity_level")
+        return level if level in COMPLEXITY_LEVELS else "intermediate"
+
+# Global instance
+personalization_service = PersonalizationService()
@@ -0,0 +1,62 @@
+from typing import List, Dict, Any
+import re
+from backend.rag.core.config import settings
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class QueryExpander:
+    """Splits multi-part questions into sub-queries and fuses their search results"""
+
+    def __init__(self):
+        self.sentence_pattern = re.compile(r'[?;\n]+')
+        self.conjunction_pattern = re.compile(
+            r'\s*(?:,\s*)?\b(?:and also|and|as well as|versus|vs\.?|compared to|compared with)\b\s*',
+            re.IGNORECASE
+        )
+
+    def expand(self, query: str, max_subqueries: int = None) -> List[str]:
+        """Split a query into the original query plus its distinct sub-questions"""
+        if max_subqueries is None:
+            max_subqueries = settings.MULTI_QUERY_MAX_SUBQUERIES
+
+        subqueries = [query.strip()]
+        for sentence in self.sentence_pattern.split(query):
+            sentence = sentence.strip(' ,.')
+            if not sentence:
+                continue
+
+            parts = [part.strip(' ,.') for part in self.conjunction_pattern.split(sentence)]
+            # Only split on conjunctions when every side reads as a question of its own
+            if len(parts) > 1 and all(len(part.split()) >= 3 for part in parts):
+                candidates = parts
+            else:
+                candidates = [sentence]
+
+            for candidate in candidates:
+                seen = {q.lower().strip(' ?,.') for q in subqueries}
+                if candidate and candidate.lower() not in seen:
+                    subqueries.append(candidate)
+
+        return subqueries[:max_subqueries]
+
+    def fuse_results(self, result_lists: List[List[Dict[str, Any]]], limit: int = None) -> List[Dict[str, Any]]:
+        """Fuse ranked result lists with reciprocal rank fusion"""
+        if limit is None:
+            limit = settings.TOP_K
+
+        fused_scores: Dict[Any, float] = {}
+        best_hits: Dict[Any, Dict[str, Any]] = {}
+        for results in result_lists:
+            for rank, hit in enumerate(results):
+                key = hit.get("id", hit["text"])
+                fused_scores[key] = fused_scores.get(key, 0.0) + 1.0 / (settings.RRF_K + rank + 1)
+                # Keep the strongest similarity score so relevance stays comparable to single search
+                if key not in best_hits or hit["score"] > best_hits[key]["score"]:
+                    best_hits[key] = hit
+
+        ranked_keys = sorted(fused_scores, key=fused_scores.get, reverse=True)
+        return [best_hits[key] for key in ranked_keys[:limit]]
+
+# Global instance
+query_expander = QueryExpander()
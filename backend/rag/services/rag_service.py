@@ -1,20 +1,21 @@
-from typing import List, Dict, Any
-from openai import OpenAI
-import os
+from typing import List, Dict, Any, Iterable, Iterator
+import asyncio
 from backend.shared.types import ChatQuery, ChatResponse
 from backend.rag.core.config import settings
+from backend.rag.core.llm_gateway import llm_gateway
+from backend.rag.core.llm_scheduler import INTERACTIVE
 from backend.rag.services.embedding_service import embedding_service
 from backend.rag.services.vector_service import vector_service
+from backend.rag.services.query_expansion import query_expander
 from backend.rag.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
 class RAGService:
     def __init__(self):
-        # Initialize OpenAI client
-        if not settings.OPENAI_API_KEY:
+        # Responses are generated through the shared LLM gateway
+        if settings.LLM_BACKEND == "openai" and not settings.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY environment variable must be set")
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
         logger.info("RAGService initialized successfully")
 
@@ -35,11 +36,71 @@ class RAGService:
             logger.error(f"Error retrieving context: {e}")
             return []
 
+    def retrieve_context_multi_query(self, query: str) -> List[Dict[str, Any]]:
+        """Retrieve context for a multi-part question with one batched encode and one batched search"""
+        try:
+            subqueries = query_expander.expand(query)
+            if len(subqueries) == 1:
+                return self.retrieve_context(query)
+
+            # Single forward pass for all sub-queries
+            query_embeddings = embedding_service.embed_texts(subqueries)
+
+            # Single round trip to the vector database for all sub-queries
+            result_lists = vector_service.search_similar_chunks_batch(
+                query_vectors=query_embeddings,
+                limit=settings.TOP_K
+            )
+
+            results = query_expander.fuse_results(result_lists, limit=settings.TOP_K)
+            logger.info(f"Retrieved {len(results)} relevant chunks for {len(subqueries)} sub-queries")
+            return results
+        except Exception as e:
+            logger.error(f"Error retrieving multi-query context: {e}")
+            return []
+
+    async def retrieve_context_async(self, query: str) -> List[Dict[str, Any]]:
+        """Retrieve relevant context using the async vector search path"""
+        try:
+            query_embedding = embedding_service.embed_query(query)
+
+            results = await vector_service.search_similar_chunks_async(
+                query_vector=query_embedding,
+                limit=settings.TOP_K
+            )
+            logger.info(f"Retrieved {len(results)} relevant chunks for query")
+            return results
+        except Exception as e:
+            logger.error(f"Error retrieving context: {e}")
+            return []
+
     def generate_response(self, query: str, context: List[Dict[str, Any]]) -> str:
         """Generate response using retrieved context"""
         if not context:
             return "I cannot answer based on the provided textbook content."
 
+        try:
+            response = llm_gateway.chat_sync(self._response_messages(query, context), priority=INTERACTIVE, max_tokens=500)
+            logger.info("Response generated successfully")
+            return response
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return "Sorry, I encountered an error while generating the response."
+
+    async def generate_response_async(self, query: str, context: List[Dict[str, Any]]) -> str:
+        """Generate response using retrieved context without blocking the event loop"""
+        if not context:
+            return "I cannot answer based on the provided textbook content."
+
+        try:
+            response = await llm_gateway.chat(self._response_messages(query, context), priority=INTERACTIVE, max_tokens=500)
+            logger.info("Response generated successfully")
+            return response
+        except Exception as e:
+            logger.error(f"Error generating response: {e}")
+            return "Sorry, I encountered an error while generating the response."
+
+    def _response_messages(self, query: str, context: List[Dict[str, Any]]) -> List[Dict[str, str]]:
         # Format context with scores and sources
         context_str = "\n".join([
             f"Source {i+1} (relevance: {item['score']:.2f}): {item['text']}"
@@ -58,30 +119,46 @@ class RAGService:
 
         Answer: """
 
-        try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=500
-            )
-            logger.info("Response generated successfully")
-            return response.choices[0].message.content
-        except Exception as e:
-            logger.error(f"Error generating response: {e}")
-            return "Sorry, I encountered an error while generating the response."
+        return [{"role": "user", "content": prompt}]
 
-    def query(self, query: str) -> ChatResponse:
+    def query(self, query: str, multi_query: bool = None) -> ChatResponse:
         """Main query method that combines embedding, retrieval, and generation"""
         logger.info(f"Processing query: {query[:50]}...")
+        if multi_query is None:
+            multi_query = settings.MULTI_QUERY_RETRIEVAL
 
         # Retrieve relevant context
-        context = self.retrieve_context(query)
+        if multi_query:
+            context = self.retrieve_context_multi_query(query)
+        else:
+            context = self.retrieve_context(query)
 
         # Generate response
         response_text = self.generate_response(query, context)
 
-        # Prepare sources for response
-        sources = [
+        logger.info("Query processed successfully")
+        return ChatResponse(response=response_text, sources=self._sources(context))
+
+    async def query_async(self, query: str, multi_query: bool = None) -> ChatResponse:
+        """Async variant of query; the LLM call does not block the event loop"""
+        logger.info(f"Processing query: {query[:50]}...")
+        if multi_query is None:
+            multi_query = settings.MULTI_QUERY_RETRIEVAL
+
+        if multi_query:
+            loop = asyncio.get_running_loop()
+            context = await loop.run_in_executor(None, self.retrieve_context_multi_query, query)
+        else:
+            context = await self.retrieve_context_async(query)
+
+        response_text = await self.generate_response_async(query, context)
+
+        logger.info("Query processed successfully")
+        return ChatResponse(response=response_text, sources=self._sources(context))
+
+    def _sources(self, context: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Prepare sources for response"""
+        return [
             {
                 "text": item["text"],
                 "score": item["score"],
@@ -92,32 +169,45 @@ class RAGService:
             for item in context
         ]
 
-        logger.info("Query processed successfully")
-        return ChatResponse(response=response_text, sources=sources)
+    def add_document_chunks(self, chunks: Iterable[Dict[str, Any]]) -> int:
+        """Add document chunks to the vector database with embeddings
 
-    def add_document_chunks(self, chunks: List[Dict[str, Any]]):
-        """Add document chunks to the vector database with embeddings"""
+        Chunks are consumed lazily and embedded in batches, so a generator of chunks
+        streams through in bounded memory.
+        """
+        total = 0
         try:
-            # Process chunks to add embeddings
-            enhanced_chunks = []
-            for chunk in chunks:
-                text = chunk['text']
-                embedding = embedding_service.embed_text(text)
-                enhanced_chunk = {
-                    'vector': embedding,
-                    'text': text,
-                    'chapter_id': chunk.get('chapter_id', ''),
-                    'section_id': chunk.get('section_id', ''),
-                    'position': chunk.get('position', 0),
-                    'heading_hierarchy': chunk.get('heading_hierarchy', '')
-                }
-                enhanced_chunks.append(enhanced_chunk)
-
-            # Add to vector database
-            success = vector_service.add_text_chunks(enhanced_chunks)
-            if success:
-                logger.info(f"Successfully added {len(enhanced_chunks)} chunks to vector database")
-            else:
-                logger.error("Failed to add chunks to vector database")
+            for batch in self._batched(chunks, settings.EMBEDDING_BATCH_SIZE):
+                embeddings = embedding_service.embed_texts([chunk['text'] for chunk in batch])
+                enhanced_chunks = [
+                    {
+                        'vector': embedding,
+                        'text': chunk['text'],
+                        'chapter_id': chunk.get('chapter_id', ''),
+                        'section_id': chunk.get('section_id', ''),
+                        'position': chunk.get('position', 0),
+                        'heading_hierarchy': chunk.get('heading_hierarchy', '')
+                    }
+                    for chunk, embedding in zip(batch, embeddings)
+                ]
+
+                # Add to vector database
+                if not vector_service.add_text_chunks(enhanced_chunks):
+                    logger.error("Failed to add chunks to vector database")
+                    return total
+                total += len(enhanced_chunks)
+
+            logger.info(f"Successfully added {total} chunks to vector database")
         except Exception as e:
-            logger.error(f"Error adding document chunks: {e}")
\ No newline at end of file
+            logger.error(f"Error adding document chunks: {e}")
+        return total
+
+    def _batched(self, items: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,63 @@
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID, uuid5
+import threading
+from backend.rag.models.chapter import Chapter
+from backend.rag.models.content import Section
+from backend.rag.services.markdown_tokenizer import markdown_tokenizer, content_hash
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class SectionService:
+    """Splits chapters into textbook_sections rows at their headings"""
+
+    def __init__(self):
+        # In-memory storage for demo purposes, derived from the chapter store
+        # In production, this would read the textbook_sections table
+        self.sections: Dict[str, Tuple[str, List[Section]]] = {}  # chapter id -> (content hash, sections)
+        self.lock = threading.Lock()
+
+    def get_sections(self, chapter: Chapter) -> List[Section]:
+        """Sections of a chapter in reading order, re-split only when the chapter content changes"""
+        chapter_id = str(chapter.id)
+        hash_value = content_hash(chapter.content)
+        with self.lock:
+            stored = self.sections.get(chapter_id)
+            if stored and stored[0] == hash_value:
+                return stored[1]
+
+        sections = self._split(chapter)
+        with self.lock:
+            self.sections[chapter_id] = (hash_value, sections)
+        logger.info(f"Split chapter {chapter_id} into {len(sections)} sections")
+        return sections
+
+    def get_section(self, chapter: Chapter, section_id: UUID) -> Optional[Section]:
+        for section in self.get_sections(chapter):
+            if section.id == section_id:
+                return section
+        return None
+
+    def _split(self, chapter: Chapter) -> List[Section]:
+        content = chapter.content
+        sections = []
+        # Same boundaries as the chapter translation sections
+        for start, end, title in markdown_tokenizer.section_spans(content):
+            section_content = content[start:end].strip()
+            if not section_content:
+                continue
+            order_index = len(sections)
+            sections.append(Section(
+                # Stable across edits, so the frontend can keep addressing the same section
+                id=uuid5(chapter.id, str(order_index)),
+                chapter_id=chapter.id,
+                title=title or chapter.title,
+                content=section_content,
+                order_index=order_index,
+                created_at=chapter.created_at,
+                updated_at=chapter.updated_at
+            ))
+        return sections
+
+# Global instance
+section_service = SectionService()
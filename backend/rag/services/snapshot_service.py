@@ -0,0 +1,77 @@
+from typing import Dict, Any
+from datetime import datetime
+import os
+import numpy as np
+from backend.rag.core.config import settings
+from backend.rag.core.qdrant_client import qdrant_setup
+from backend.rag.core.vector_snapshot import write_snapshot, read_snapshot
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+class SnapshotService:
+    """Exports the vector collection to a portable snapshot file and restores it"""
+
+    def export_snapshot(self, path: str = None) -> Dict[str, Any]:
+        """Write every point of the collection to a single snapshot file"""
+        if path is None:
+            path = settings.VECTOR_SNAPSHOT_PATH
+
+        ids, payloads, vector_batches = [], [], []
+        for records in qdrant_setup.scroll_all_points():
+            for record in records:
+                ids.append(record.id)
+                payloads.append(record.payload)
+            if records:
+                vector_batches.append(np.asarray([record.vector for record in records], dtype=np.float32))
+
+        if vector_batches:
+            vectors = np.concatenate(vector_batches)
+        else:
+            vectors = np.zeros((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_snapshot(path, ids, payloads, vectors, {
+            "collection_name": settings.QDRANT_COLLECTION_NAME,
+            "embedding_model": settings.EMBEDDING_MODEL,
+            "embedding_model_version": settings.EMBEDDING_MODEL_VERSION,
+            "distance": "cosine",
+            "created_at": datetime.utcnow().isoformat()
+        })
+
+        logger.info(f"Exported {len(ids)} vectors to snapshot {path}")
+        return {"path": path, "count": len(ids), "bytes": os.path.getsize(path)}
+
+    def import_snapshot(self, path: str = None, force: bool = False, batch_size: int = 256) -> Dict[str, Any]:
+        """Bulk-restore a snapshot file into the Qdrant collection"""
+        if path is None:
+            path = settings.VECTOR_SNAPSHOT_PATH
+
+        header, vectors = read_snapshot(path)
+        self.check_compatibility(header, force)
+
+        qdrant_setup.restore_points(header["ids"], vectors, header["payloads"], batch_size=batch_size)
+
+        logger.info(f"Imported {header['count']} vectors from snapshot {path}")
+        return {"path": path, "count": header["count"], "embedding_model": header["embedding_model"]}
+
+    def check_compatibility(self, header: Dict[str, Any], force: bool = False):
+        """Refuse snapshots built with a different embedding model than the one serving queries"""
+        mismatches = []
+        if header.get("embedding_model") != settings.EMBEDDING_MODEL:
+            mismatches.append(f"model {header.get('embedding_model')} != {settings.EMBEDDING_MODEL}")
+        if header.get("embedding_model_version") != settings.EMBEDDING_MODEL_VERSION:
+            mismatches.append(f"version {header.get('embedding_model_version')} != {settings.EMBEDDING_MODEL_VERSION}")
+        if header.get("dimension") != settings.EMBEDDING_DIMENSION:
+            mismatches.append(f"dimension {header.get('dimension')} != {settings.EMBEDDING_DIMENSION}")
+
+        if mismatches:
+            message = f"Snapshot is incompatible with the configured embedding model: {', '.join(mismatches)}"
+            if not force:
+                raise ValueError(message)
+            logger.warning(message)
+
+# Global instance
+snapshot_service = SnapshotService()
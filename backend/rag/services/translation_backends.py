@@ -0,0 +1,123 @@
+from typing import Any, Dict, List, Optional, Tuple
+from backend.rag.core.config import settings
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TORCH = "torch"
+CTRANSLATE2 = "ctranslate2"
+ONNX = "onnx"
+
+
+class CTranslate2Translator:
+    """int8 CTranslate2 Marian model with the call signature of a transformers translation pipeline
+
+    The model directory is produced once with:
+        ct2-transformers-converter --model Helsinki-NLP/opus-mt-en-ur --output_dir <dir> --quantization int8
+    """
+
+    def __init__(self, model_dir: str, tokenizer_name: str):
+        import ctranslate2
+        from transformers import AutoTokenizer
+
+        self.model = ctranslate2.Translator(
+            model_dir,
+            device="cpu",
+            compute_type="int8",
+            intra_threads=settings.TRANSLATION_TORCH_THREADS
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+
+    def __call__(self, texts: List[str], batch_size: int = 16, max_length: int = 512,
+                 **kwargs) -> List[Dict[str, str]]:
+        if isinstance(texts, str):
+            texts = [texts]
+        source_tokens = [
+            self.tokenizer.convert_ids_to_tokens(
+                self.tokenizer.encode(text, truncation=True, max_length=self.tokenizer.model_max_length)
+            )
+            for text in texts
+        ]
+        results = self.model.translate_batch(
+            source_tokens,
+            max_batch_size=batch_size,
+            beam_size=settings.TRANSLATION_BEAM_SIZE,
+            max_decoding_length=max_length
+        )
+        return [
+            {
+                'translation_text': self.tokenizer.decode(
+                    self.tokenizer.convert_tokens_to_ids(result.hypotheses[0]),
+                    skip_special_tokens=True
+                )
+            }
+            for result in results
+        ]
+
+
+def _load_onnx(model_dir: str, tokenizer_name: str):
+    """Quantized ONNX export run through ONNX Runtime, wrapped in a regular transformers pipeline
+
+    The model directory is produced with optimum's exporter and dynamic int8 quantizer
+    (optimum-cli export onnx, then optimum-cli onnxruntime quantize --avx2).
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_dir)
+    tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+    return pipeline("translation", model=model, tokenizer=tokenizer)
+
+
+def _load_torch():
+    import torch
+    from transformers import pipeline
+
+    # torch's intra-op pool is process-wide: this bounds every torch op in the process,
+    # embedding inference included, not each translation worker separately
+    torch.set_num_threads(settings.TRANSLATION_TORCH_THREADS)
+    return pipeline(
+        "translation",
+        model=settings.TRANSLATION_MODEL,
+        device=0 if torch.cuda.is_available() else -1
+    )
+
+
+def model_id(backend: str) -> str:
+    """Identifier for translation memory entries; quantized backends produce slightly different output"""
+    if backend == TORCH:
+        return settings.TRANSLATION_MODEL
+    return f"{settings.TRANSLATION_MODEL}@{backend}-int8"
+
+
+def load_translator(backend: str = None) -> Tuple[Optional[Any], str]:
+    """Load the configured translation backend, falling back to the torch pipeline
+
+    Returns (translator, backend actually loaded); translator is None when nothing could be loaded.
+    """
+    backend = backend or settings.TRANSLATION_BACKEND
+    model_dir = settings.TRANSLATION_MODEL_DIR
+    # The converted model directory does not always carry the tokenizer files
+    tokenizer_name = settings.TRANSLATION_MODEL
+
+    if backend in (CTRANSLATE2, ONNX):
+        if not model_dir:
+            logger.warning(f"TRANSLATION_BACKEND={backend} needs TRANSLATION_MODEL_DIR, using the torch pipeline")
+        else:
+            try:
+                if backend == CTRANSLATE2:
+                    translator = CTranslate2Translator(model_dir, tokenizer_name)
+                else:
+                    translator = _load_onnx(model_dir, tokenizer_name)
+                logger.info(f"Loaded int8 {backend} translation model from {model_dir}")
+                return translator, backend
+            except Exception as e:
+                logger.warning(f"Could not load {backend} translation model from {model_dir}: {e}")
+    elif backend != TORCH:
+        logger.warning(f"Unknown TRANSLATION_BACKEND {backend!r}, using the torch pipeline")
+
+    try:
+        return _load_torch(), TORCH
+    except Exception as e:
+        logger.warning(f"Could not load translation model: {e}")
+        return None, TORCH
@@ -0,0 +1,148 @@
+from typing import Any, Callable, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from backend.rag.core.config import settings
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Set for the duration of each translation job; the translation service checks it between batches
+current_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "translation_cancel_event", default=None
+)
+
+
+class TranslationQueueFullError(Exception):
+    """Raised when the translation queue is saturated and a request must be rejected"""
+    def __init__(self, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Translation queue is full, retry after {retry_after}s")
+
+
+class TranslationCancelledError(Exception):
+    """Raised inside a translation job once its request has been cancelled"""
+    pass
+
+
+def raise_if_cancelled():
+    """Abort the current translation job if its request was cancelled or timed out"""
+    cancel_event = current_cancel_event.get()
+    if cancel_event is not None and cancel_event.is_set():
+        raise TranslationCancelledError("Translation cancelled")
+
+
+class TranslationExecutor:
+    """Bounded executor that keeps model inference off the event loop, with admission control"""
+
+    def __init__(self):
+        self.workers = settings.TRANSLATION_WORKERS
+        self.max_queue = settings.TRANSLATION_MAX_QUEUE
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="translation"
+        )
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.average_duration = 1.0  # seconds, exponentially weighted
+
+    @property
+    def queue_depth(self) -> int:
+        with self.lock:
+            return max(self.in_flight - self.workers, 0)
+
+    def _admit(self):
+        with self.lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                # Time for the jobs ahead of this one to drain through the workers
+                retry_after = math.ceil(self.average_duration * self.in_flight / self.workers)
+                raise TranslationQueueFullError(max(retry_after, 1))
+            self.in_flight += 1
+
+    def _release(self, duration: Optional[float]):
+        with self.lock:
+            self.in_flight -= 1
+            if duration is not None:
+                self.average_duration = 0.8 * self.average_duration + 0.2 * duration
+
+    def submit(self, func: Callable[..., Any], *args) -> Future:
+        """Queue background work, e.g. precomputed chapter translations, on the same workers
+
+        It counts against the same admission bound as requests, so raises
+        TranslationQueueFullError when saturated; there is no timeout or cancellation.
+        """
+        self._admit()
+        started = []
+
+        def job():
+            started.append(time.perf_counter())
+            return func(*args)
+
+        work = self.executor.submit(job)
+        work.add_done_callback(
+            lambda _: self._release(time.perf_counter() - started[0] if started else None)
+        )
+        return work
+
+    async def run(self, func: Callable[..., Any], *args, request=None, timeout: float = None) -> Any:
+        """Run func(*args) on the translation workers
+
+        Raises TranslationQueueFullError when saturated, asyncio.TimeoutError after timeout and
+        TranslationCancelledError if the client behind request disconnects first.
+        """
+        if timeout is None:
+            timeout = settings.TRANSLATION_TIMEOUT
+
+        self._admit()
+        cancel_event = threading.Event()
+        started = []
+
+        def job():
+            started.append(time.perf_counter())
+            raise_if_cancelled()
+            return func(*args)
+
+        context = contextvars.copy_context()
+        context.run(current_cancel_event.set, cancel_event)
+        work = self.executor.submit(context.run, job)
+        # Free the slot only once the worker is actually done with the job, even after a cancel
+        work.add_done_callback(
+            lambda _: self._release(time.perf_counter() - started[0] if started else None)
+        )
+        future = asyncio.wrap_future(work)
+        # Results of abandoned jobs are intentionally discarded
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        watcher = asyncio.ensure_future(self._watch_disconnect(request)) if request is not None else None
+        try:
+            waiters = [future] if watcher is None else [future, watcher]
+            done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if future in done:
+                return future.result()
+
+            # Signal the job so a running translation stops at its next batch boundary
+            cancel_event.set()
+            work.cancel()
+            if watcher is not None and watcher in done:
+                logger.info("Client disconnected, translation cancelled")
+                raise TranslationCancelledError("Client disconnected")
+            logger.warning(f"Translation timed out after {timeout}s")
+            raise asyncio.TimeoutError()
+        except asyncio.CancelledError:
+            cancel_event.set()
+            work.cancel()
+            raise
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+    async def _watch_disconnect(self, request, poll_interval: float = 0.5):
+        while not await request.is_disconnected():
+            await asyncio.sleep(poll_interval)
+
+
+# Global instance
+translation_executor = TranslationExecutor()
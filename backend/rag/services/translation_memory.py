@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from backend.rag.core.config import settings
+from backend.rag.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_whitespace_pattern = re.compile(r'\s+')
+
+
+def normalize_source(text: str) -> str:
+    """Normalize a source sentence so trivially different copies share one entry"""
+    return _whitespace_pattern.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha256(normalize_source(text).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """Sentence-level translation cache: an in-process LRU in front of a local SQLite store"""
+
+    def __init__(self, db_path: str = None, lru_size: int = None):
+        self.db_path = db_path or settings.TRANSLATION_MEMORY_PATH
+        self.lru_size = lru_size or settings.TRANSLATION_MEMORY_LRU_SIZE
+        self._lru: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translation_memory (
+                model_id TEXT NOT NULL,
+                source_hash TEXT NOT NULL,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                PRIMARY KEY (model_id, source_hash)
+            )
+            """
+        )
+        self._connection.commit()
+
+    def get_many(self, model_id: str, texts: List[str]) -> List[Optional[str]]:
+        """Look up translations for texts, returning None for misses"""
+        keys = [(model_id, source_hash(text)) for text in texts]
+        results: List[Optional[str]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                translation = self._lru.get(key)
+                if translation is not None:
+                    self._lru.move_to_end(key)
+                    results[i] = translation
+                else:
+                    missing.setdefault(key[1], []).append(i)
+
+            if missing:
+                hashes = list(missing)
+                # Stay under SQLite's bound-parameter limit
+                for start in range(0, len(hashes), 500):
+                    batch = hashes[start:start + 500]
+                    rows = self._connection.execute(
+                        f"SELECT source_hash, translation FROM translation_memory "
+                        f"WHERE model_id = ? AND source_hash IN ({','.join('?' * len(batch))})",
+                        [model_id, *batch]
+                    ).fetchall()
+                    for hash_value, translation in rows:
+                        for i in missing[hash_value]:
+                            results[i] = translation
+                        self._remember((model_id, hash_value), translation)
+
+        return results
+
+    def put_many(self, model_id: str, pairs: List[Tuple[str, str]]):
+        """Store (source, translation) pairs in both tiers"""
+        if not pairs:
+            return
+
+        rows = [(model_id, source_hash(source), normalize_source(source), translation) for source, translation in pairs]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO translation_memory (model_id, source_hash, source, translation) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._connection.commit()
+            for row in rows:
+                self._remember((row[0], row[1]), row[3])
+
+    def _remember(self, key: Tuple[str, str], translation: str):
+        self._lru[key] = translation
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def export_jsonl(self, path: str, model_id: str = None) -> int:
+        """Write the memory as JSON lines of {model_id, source, translation}"""
+        query = "SELECT model_id, source, translation FROM translation_memory"
+        params: list = []
+        if model_id:
+            query += " WHERE model_id = ?"
+            params.append(model_id)
+
+        count = 0
+        with self._lock:
+            rows = self._connection.execute(query, params)
+            with open(path, "w", encoding="utf-8") as f:
+                for row_model_id, source, translation in rows:
+                    f.write(json.dumps(
+                        {"model_id": row_model_id, "source": source, "translation": translation},
+                        ensure_ascii=False
+                    ) + "\n")
+                    count += 1
+
+        logger.info(f"Exported {count} translation memory entries to {path}")
+        return count
+
+    def import_jsonl(self, path: str, batch_size: int = 1000) -> int:
+        """Load entries written by export_jsonl, replacing existing entries for the same source"""
+        count = 0
+        pending: Dict[str, List[Tuple[str, str]]] = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                pending.setdefault(entry["model_id"], []).append((entry["source"], entry["translation"]))
+                count += 1
+                if count % batch_size == 0:
+                    for entry_model_id, pairs in pending.items():
+                        self.put_many(entry_model_id, pairs)
+                    pending = {}
+
+        for entry_model_id, pairs in pending.items():
+            self.put_many(entry_model_id, pairs)
+
+        logger.info(f"Imported {count} translation memory entries from {path}")
+        return count
+
+
+# Global instance
+translation_memory = TranslationMemory()
@@ -1,9 +1,15 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional
 from backend.shared.types import TranslationRequest
-from transformers import pipeline, AutoTokenizer, AutoModelForSeq2SeqLM
-import torch
+from backend.rag.core.config import settings
+from backend.rag.services.translation_memory import translation_memory
+from backend.rag.services.translation_executor import raise_if_cancelled
+from backend.rag.services.translation_backends import load_translator, model_id
+from backend.rag.services.markdown_tokenizer import markdown_tokenizer, HEADING, CODE, TABLE, LIST
 import re
 
+# Marks text whose translation failed; such output must never be cached
+TRANSLATION_ERROR_PREFIX = "[TRANSLATION ERROR: "
+
 
 class FormattingPreserver:
     """Helper class to preserve formatting during translation"""
@@ -11,67 +17,48 @@ class FormattingPreserver:
     def parse_markdown(self, content: str) -> list:
         """Parse markdown content into structured blocks"""
         blocks = []
-        lines = content.split('\n')
+        tokens = markdown_tokenizer.tokenize(content)
+        blank_runs = markdown_tokenizer.blank_line_runs(content, tokens)
 
-        i = 0
-        while i < len(lines):
-            line = lines[i]
+        for token, blank_lines in zip(tokens, blank_runs):
+            blocks.extend({'type': 'empty', 'content': '', 'original_line': ''} for _ in range(blank_lines))
 
-            # Check for headings
-            if line.startswith('#'):
-                level = len(line) - len(line.lstrip('#'))
-                content = line.lstrip('# ').strip()
+            if token.kind == HEADING:
                 blocks.append({
                     'type': 'heading',
-                    'level': level,
-                    'content': content,
-                    'original_line': line
+                    'level': token.level,
+                    'content': token.heading_text,
+                    'original_line': token.text
                 })
-            # Check for code blocks
-            elif line.startswith('```'):
-                code_block = [line]
-                i += 1
-                while i < len(lines) and not lines[i].startswith('```'):
-                    code_block.append(lines[i])
-                    i += 1
-                if i < len(lines):
-                    code_block.append(lines[i])  # Add closing ```
+            elif token.kind == CODE:
                 blocks.append({
                     'type': 'code',
-                    'content': '\n'.join(code_block),
-                    'original_lines': code_block
-                })
-            # Check for list items
-            elif line.strip().startswith(('- ', '* ', '1. ', '2. ', '3. ')):
-                blocks.append({
-                    'type': 'list_item',
-                    'content': line.strip(),
-                    'original_line': line
+                    'content': token.text,
+                    'original_lines': token.text.split('\n')
                 })
-            # Check for bold/italic markers - store separately to preserve
-            elif line.strip().startswith(('**', '*')) and line.strip().endswith(('**', '*')):
+            elif token.kind == TABLE:
                 blocks.append({
-                    'type': 'formatted',
-                    'content': line.strip(),
-                    'original_line': line
+                    'type': 'table',
+                    'content': token.text,
+                    'original_lines': token.text.split('\n')
                 })
-            # Regular paragraph
             else:
-                if line.strip():
-                    blocks.append({
-                        'type': 'text',
-                        'content': line.strip(),
-                        'original_line': line
-                    })
-                else:
+                for line in token.text.split('\n'):
+                    stripped = line.strip()
+                    if token.kind == LIST:
+                        block_type = 'list_item'
+                    # Check for bold/italic markers - store separately to preserve
+                    elif stripped.startswith(('**', '*')) and stripped.endswith(('**', '*')):
+                        block_type = 'formatted'
+                    else:
+                        block_type = 'text'
                     blocks.append({
-                        'type': 'empty',
-                        'content': '',
+                        'type': block_type,
+                        'content': stripped,
                         'original_line': line
                     })
 
-            i += 1
-
+        blocks.extend({'type': 'empty', 'content': '', 'original_line': ''} for _ in range(blank_runs[-1]))
         return blocks
 
     def reconstruct_markdown(self, blocks: list) -> str:
@@ -80,7 +67,7 @@ class FormattingPreserver:
         for block in blocks:
             if block['type'] == 'heading':
                 result.append(f"{'#' * block['level']} {block['content']}")
-            elif block['type'] == 'code':
+            elif block['type'] in ('code', 'table'):
                 result.append(block['content'])
             elif block['type'] == 'list_item':
                 result.append(block['content'])
@@ -97,19 +84,16 @@ class FormattingPreserver:
 class UrduTranslationService:
     def __init__(self):
         # Initialize the translation pipeline for English to Urdu
-        # Using a pre-trained model for English to Urdu translation
-        try:
-            self.translator = pipeline(
-                "translation",
-                model="Helsinki-NLP/opus-mt-en-ur",
-                device=0 if torch.cuda.is_available() else -1
-            )
-        except Exception as e:
-            print(f"Warning: Could not load translation model: {e}")
+        # Using a pre-trained model, run by the configured backend (torch, or int8 CTranslate2/ONNX Runtime)
+        self.translator, self.backend = load_translator()
+        if self.translator is None:
             print("Falling back to mock translation service")
-            self.translator = None
+        # Translation memory entries are kept apart per backend, since int8 output differs slightly
+        self.model_id = model_id(self.backend)
 
         self.formatter_preserver = FormattingPreserver()
+        self.sentence_pattern = re.compile(r'(?<=[.!?؟۔])\s+')
+        self.clause_pattern = re.compile(r'(?<=[,;:])\s+')
 
     def translate_content(self, content: str, preserve_formatting: bool = True) -> str:
         """Translate content to Urdu while preserving formatting"""
@@ -119,51 +103,231 @@ class UrduTranslationService:
         if preserve_formatting:
             # Parse and preserve markdown structure
             parsed_content = self.formatter_preserver.parse_markdown(content)
-            translated_blocks = []
-
-            for block in parsed_content:
-                if block['type'] == 'text':
-                    # Translate text blocks
-                    translated_text = self._translate_text(block['content'])
-                    translated_blocks.append({
-                        **block,
-                        'content': translated_text
-                    })
-                elif block['type'] == 'heading':
-                    # Translate heading content but preserve structure
-                    translated_text = self._translate_text(block['content'])
-                    translated_blocks.append({
-                        **block,
-                        'content': translated_text
-                    })
-                elif block['type'] == 'list_item':
-                    # Translate list item content but preserve structure
-                    translated_text = self._translate_text(block['content'])
-                    translated_blocks.append({
-                        **block,
-                        'content': translated_text
-                    })
-                else:
-                    # Preserve non-translatable elements (code, etc.) as-is
-                    translated_blocks.append(block)
+
+            # Gather headings, text and list items so the whole chapter is translated in batches;
+            # code and other non-translatable elements are preserved as-is
+            translatable_indices = [
+                i for i, block in enumerate(parsed_content)
+                if block['type'] in ('text', 'heading', 'list_item')
+            ]
+            translations = self._translate_texts([parsed_content[i]['content'] for i in translatable_indices])
+
+            translated_blocks = list(parsed_content)
+            for i, translated_text in zip(translatable_indices, translations):
+                translated_blocks[i] = {
+                    **parsed_content[i],
+                    'content': translated_text
+                }
 
             return self.formatter_preserver.reconstruct_markdown(translated_blocks)
         else:
             return self._translate_text(content)
 
+    def iter_translated_blocks(self, content: str) -> Iterator[List[Dict[str, Any]]]:
+        """Translate content block by block, yielding lists of translated blocks in document order
+
+        Each block is {'index', 'type', 'markdown'}; joining every block's markdown with newlines
+        gives the same result as translate_content. Blocks already in the translation memory, and
+        non-translatable blocks, are yielded as soon as everything before them is out; the rest is
+        translated in windows of about TRANSLATION_BATCH_SIZE segments, so only one window of
+        translations is held at a time.
+        """
+        parsed_content = self.formatter_preserver.parse_markdown(content)
+        window: List[int] = []
+        window_segments = 0
+        ready: List[Dict[str, Any]] = []
+
+        def event(i: int, translated: str = None) -> Dict[str, Any]:
+            block = parsed_content[i] if translated is None else {**parsed_content[i], 'content': translated}
+            return {
+                'index': i,
+                'type': block['type'],
+                'markdown': self.formatter_preserver.reconstruct_markdown([block])
+            }
+
+        def flush_window() -> List[Dict[str, Any]]:
+            translatable = [i for i in window if self._is_translatable(parsed_content[i])]
+            translations = dict(zip(
+                translatable,
+                self._translate_texts([parsed_content[i]['content'] for i in translatable])
+            ))
+            return [event(i, translations.get(i)) for i in window]
+
+        def ready_event(i: int) -> Optional[Dict[str, Any]]:
+            """Event for a block that needs no model call, else None"""
+            if not self._is_translatable(parsed_content[i]):
+                return event(i)
+            cached = self._cached_translation(parsed_content[i]['content'])
+            return event(i, cached) if cached is not None else None
+
+        for i, block in enumerate(parsed_content):
+            if not window:
+                ready_block = ready_event(i)
+                if ready_block is not None:
+                    ready.append(ready_block)
+                    if len(ready) >= settings.TRANSLATION_BATCH_SIZE:
+                        yield ready
+                        ready = []
+                    continue
+                if ready:
+                    yield ready
+                    ready = []
+
+            window.append(i)
+            if self._is_translatable(block):
+                window_segments += len(self.segment_text(block['content']))
+            if window_segments >= settings.TRANSLATION_BATCH_SIZE:
+                yield flush_window()
+                window, window_segments = [], 0
+
+        if window:
+            yield flush_window()
+        elif ready:
+            yield ready
+
+    def _is_translatable(self, block: Dict[str, Any]) -> bool:
+        return block['type'] in ('text', 'heading', 'list_item') and bool(block['content'].strip())
+
+    def _cached_translation(self, text: str) -> Optional[str]:
+        """Translation of text assembled from the translation memory, or None unless every segment is cached"""
+        if not self.translator:
+            return None
+        segments = self.segment_text(text)
+        cached = translation_memory.get_many(self.model_id, segments)
+        if not segments or any(translation is None for translation in cached):
+            return None
+        return " ".join(cached)
+
     def _translate_text(self, text: str) -> str:
         """Internal translation method"""
-        if not text.strip():
-            return text
-
-        if self.translator:
-            try:
-                # Use the translation pipeline
-                result = self.translator(text, max_length=1000)
-                return result[0]['translation_text']
-            except Exception as e:
-                print(f"Translation error: {e}")
-                return f"[TRANSLATION ERROR: {text}]"
-        else:
+        return self._translate_texts([text])[0]
+
+    def _translate_texts(self, texts: List[str]) -> List[str]:
+        """Translate many texts with batched pipeline calls, preserving input order"""
+        results = list(texts)
+        pending = [i for i, text in enumerate(texts) if text.strip()]
+        if not pending:
+            return results
+
+        if not self.translator:
             # Fallback translation for demo purposes
-            return f"URDU TRANSLATION: {text}"
\ No newline at end of file
+            for i in pending:
+                results[i] = f"URDU TRANSLATION: {texts[i]}"
+            return results
+
+        # Split every text into segments the model can take without truncation
+        segments = []
+        owners = []
+        for i in pending:
+            for segment in self.segment_text(texts[i]):
+                segments.append(segment)
+                owners.append(i)
+
+        translated_segments = self._translate_segments(segments)
+
+        # Reassemble the segments of each text in their original order
+        parts: Dict[int, List[str]] = {i: [] for i in pending}
+        failed = set()
+        for owner, translated in zip(owners, translated_segments):
+            if translated is None:
+                failed.add(owner)
+            else:
+                parts[owner].append(translated)
+        for i in pending:
+            results[i] = f"{TRANSLATION_ERROR_PREFIX}{texts[i]}]" if i in failed else " ".join(parts[i])
+
+        return results
+
+    def segment_text(self, text: str) -> List[str]:
+        """Split text into sentences, further splitting any that exceed the model's input limit"""
+        limit = self._max_input_tokens()
+        segments = []
+        for sentence in self.sentence_pattern.split(text.strip()):
+            if not sentence.strip():
+                continue
+            if self._count_tokens(sentence) <= limit:
+                segments.append(sentence)
+                continue
+            # Over-long sentence: fall back to clause boundaries, then to word windows
+            for clause in self.clause_pattern.split(sentence):
+                if self._count_tokens(clause) <= limit:
+                    segments.append(clause)
+                else:
+                    segments.extend(self._split_words(clause, limit))
+        return segments
+
+    def _split_words(self, text: str, limit: int) -> List[str]:
+        windows = []
+        current = []
+        current_tokens = 0
+        for word in text.split():
+            word_tokens = self._count_tokens(word)
+            if current and current_tokens + word_tokens > limit:
+                windows.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(word)
+            current_tokens += word_tokens
+        if current:
+            windows.append(" ".join(current))
+        return windows
+
+    def _count_tokens(self, text: str) -> int:
+        tokenizer = getattr(self.translator, "tokenizer", None)
+        if tokenizer is None:
+            return len(text.split())
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    def _max_input_tokens(self) -> int:
+        tokenizer = getattr(self.translator, "tokenizer", None)
+        model_limit = getattr(tokenizer, "model_max_length", settings.TRANSLATION_MAX_INPUT_TOKENS)
+        # Leave room for the end-of-sequence token
+        return min(settings.TRANSLATION_MAX_INPUT_TOKENS, model_limit - 1)
+
+    def _translate_segments(self, segments: List[str]) -> List[Optional[str]]:
+        """Translate segments via the translation memory and length-bucketed model batches
+
+        Returns None for segments whose batch failed.
+        """
+        results: List[Optional[str]] = [None] * len(segments)
+
+        # Only sentences missing from the translation memory go to the model
+        cached = translation_memory.get_many(self.model_id, segments)
+        misses = []
+        for i, translation in enumerate(cached):
+            if translation is not None:
+                results[i] = translation
+            else:
+                misses.append(i)
+        if not misses:
+            return results
+
+        # Bucket by token length (powers of two) so each batch pads to a similar length
+        lengths = {i: self._count_tokens(segments[i]) for i in misses}
+        buckets: Dict[int, List[int]] = {}
+        for i in misses:
+            buckets.setdefault(lengths[i].bit_length(), []).append(i)
+
+        batch_size = settings.TRANSLATION_BATCH_SIZE
+        for bucket in sorted(buckets):
+            members = sorted(buckets[bucket], key=lambda i: lengths[i])
+            for start in range(0, len(members), batch_size):
+                # Stop between batches if the request was cancelled or timed out
+                raise_if_cancelled()
+                batch = members[start:start + batch_size]
+                try:
+                    outputs = self.translator(
+                        [segments[i] for i in batch],
+                        batch_size=batch_size,
+                        max_length=settings.TRANSLATION_MAX_OUTPUT_TOKENS
+                    )
+                except Exception as e:
+                    print(f"Translation error: {e}")
+                    continue
+                for i, output in zip(batch, outputs):
+                    results[i] = output['translation_text']
+                translation_memory.put_many(self.model_id, [(segments[i], results[i]) for i in batch])
+
+        return results
+
+# Global instance
+urdu_translation_service = UrduTranslationService()
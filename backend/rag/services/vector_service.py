@@ -1,20 +1,65 @@
 from typing import List, Dict, Any, Optional
 from uuid import UUID
+from collections import deque
+import threading
+import time
 from backend.rag.core.qdrant_client import qdrant_setup
+from backend.rag.core.vector_snapshot import LocalVectorIndex
 from backend.rag.core.config import settings
 from backend.rag.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+class SearchLatencyTracker:
+    """Keeps a rolling window of recent search latencies"""
+
+    def __init__(self, window_size: int = 1000):
+        self.latencies = deque(maxlen=window_size)
+        self.lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self.lock:
+            self.latencies.append(seconds)
+
+    def percentiles(self) -> Dict[str, Any]:
+        """Return p50/p95/p99 in milliseconds over the current window"""
+        with self.lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return {"samples": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+
+        def percentile(fraction: float) -> float:
+            index = min(int(fraction * len(samples)), len(samples) - 1)
+            return round(samples[index] * 1000, 3)
+
+        return {
+            "samples": len(samples),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99)
+        }
+
+
 class VectorService:
     def __init__(self):
         """Initialize the vector storage service"""
-        # Ensure the collection exists
-        qdrant_setup.create_collection()
+        self.latency_tracker = SearchLatencyTracker()
+        self.local_index: Optional[LocalVectorIndex] = None
+        if settings.VECTOR_BACKEND == "local":
+            # Serve straight from a memory-mapped snapshot, no Qdrant required
+            self.local_index = LocalVectorIndex(settings.VECTOR_SNAPSHOT_PATH)
+            logger.info(f"Loaded local vector index with {len(self.local_index.ids)} vectors")
+        else:
+            # Ensure the collection exists
+            qdrant_setup.create_collection()
         logger.info("Vector storage service initialized")
 
     def add_text_chunks(self, chunks: List[Dict[str, Any]]) -> bool:
         """Add text chunks with embeddings to the vector database"""
+        if self.local_index is not None:
+            logger.error("Cannot add chunks to a read-only local snapshot index")
+            return False
+
         try:
             qdrant_setup.add_textbook_chunks(chunks)
             logger.info(f"Added {len(chunks)} chunks to vector database")
@@ -29,13 +74,66 @@ class VectorService:
             limit = settings.TOP_K
 
         try:
-            results = qdrant_setup.search_chunks(query_vector, limit)
+            start = time.perf_counter()
+            if self.local_index is not None:
+                results = self.local_index.search(query_vector, limit)
+            else:
+                results = qdrant_setup.search_chunks(query_vector, limit)
+            self.latency_tracker.record(time.perf_counter() - start)
+            logger.info(f"Found {len(results)} similar chunks for query")
+            return results
+        except Exception as e:
+            logger.error(f"Failed to search similar chunks: {e}")
+            return []
+
+    def search_similar_chunks_batch(self, query_vectors: List[List[float]], limit: int = None) -> List[List[Dict[str, Any]]]:
+        """Search for similar chunks for several query vectors in one request"""
+        if limit is None:
+            limit = settings.TOP_K
+
+        try:
+            start = time.perf_counter()
+            if self.local_index is not None:
+                results = self.local_index.search_batch(query_vectors, limit)
+            else:
+                results = qdrant_setup.search_batch(query_vectors, limit)
+            self.latency_tracker.record(time.perf_counter() - start)
+            logger.info(f"Found {sum(len(hits) for hits in results)} similar chunks for {len(query_vectors)} queries")
+            return results
+        except Exception as e:
+            logger.error(f"Failed to batch search similar chunks: {e}")
+            return [[] for _ in query_vectors]
+
+    async def search_similar_chunks_async(self, query_vector: List[float], limit: int = None) -> List[Dict[str, Any]]:
+        """Search for similar chunks using the async Qdrant client"""
+        if limit is None:
+            limit = settings.TOP_K
+
+        try:
+            start = time.perf_counter()
+            if self.local_index is not None:
+                results = self.local_index.search(query_vector, limit)
+            else:
+                results = await qdrant_setup.search_chunks_async(query_vector, limit)
+            self.latency_tracker.record(time.perf_counter() - start)
             logger.info(f"Found {len(results)} similar chunks for query")
             return results
         except Exception as e:
             logger.error(f"Failed to search similar chunks: {e}")
             return []
 
+    def get_chapter_chunks(self, chapter_id: str) -> List[Dict[str, Any]]:
+        """All indexed chunks of a chapter, with vectors, in reading order"""
+        try:
+            if self.local_index is not None:
+                chunks = self.local_index.get_chapter_chunks(chapter_id)
+            else:
+                chunks = qdrant_setup.get_chapter_chunks(chapter_id)
+            return sorted(chunks, key=lambda chunk: chunk["original_position"])
+        except Exception as e:
+            logger.error(f"Failed to fetch chunks for chapter {chapter_id}: {e}")
+            return []
+
     def delete_by_chapter_id(self, chapter_id: str) -> bool:
         """Delete all vectors associated with a specific chapter ID"""
         # Note: This would require Qdrant client functionality to delete by payload
@@ -46,12 +144,42 @@ class VectorService:
 
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the vector collection"""
-        # Note: This would require Qdrant client functionality to get collection info
-        return {
+        stats = {
             "collection_name": settings.QDRANT_COLLECTION_NAME,
-            "status": "active",
-            "count": 0  # Would be actual count from Qdrant
+            "backend": "local" if self.local_index is not None else "qdrant",
+            "embedding_model": settings.EMBEDDING_MODEL,
+            "embedding_model_version": settings.EMBEDDING_MODEL_VERSION,
+            "search_latency": self.latency_tracker.percentiles()
         }
 
+        if self.local_index is not None:
+            chapter_counts: Dict[str, int] = {}
+            for payload in self.local_index.payloads:
+                chapter_id = payload.get("chapter_id", "")
+                chapter_counts[chapter_id] = chapter_counts.get(chapter_id, 0) + 1
+            model = f"{self.local_index.header.get('embedding_model')}@{self.local_index.header.get('embedding_model_version')}"
+            stats.update({
+                "status": "green",
+                "count": len(self.local_index.ids),
+                "chunks_per_chapter": chapter_counts,
+                "embedding_models_indexed": {model: len(self.local_index.ids)}
+            })
+            return stats
+
+        try:
+            info = qdrant_setup.get_collection_info()
+            payload_counts = qdrant_setup.count_by_payload(info["points_count"])
+            stats.update(info)
+            stats.update({
+                "count": info["points_count"],
+                "chunks_per_chapter": payload_counts["chapters"],
+                "embedding_models_indexed": payload_counts["embedding_models"]
+            })
+        except Exception as e:
+            logger.error(f"Failed to get collection stats: {e}")
+            stats.update({"status": "unavailable", "error": str(e)})
+
+        return stats
+
 # Global instance
 vector_service = VectorService()
\ No newline at end of file
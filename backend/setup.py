@@ -9,7 +9,7 @@ setup(
         "uvicorn[standard]>=0.24.0",
         "pydantic>=2.5.0",
         "sqlalchemy>=2.0.23",
-        "qdrant-client>=1.7.0",
+        "qdrant-client>=1.12.0,<2.0",
         "openai>=1.3.7",
         "sentence-transformers>=2.2.2",
         "torch>=2.1.1",
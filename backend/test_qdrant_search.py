@@ -0,0 +1,49 @@
+"""
+Search paths of QdrantSetup against an in-memory Qdrant, so client API changes surface here
+"""
+import pytest
+from qdrant_client import QdrantClient
+
+from backend.rag.core.config import settings
+from backend.rag.core.qdrant_client import QdrantSetup
+
+
+@pytest.fixture
+def qdrant(monkeypatch):
+    monkeypatch.setattr(settings, "QDRANT_COLLECTION_NAME", "test_chunks")
+    monkeypatch.setattr(settings, "EMBEDDING_DIMENSION", 4)
+    monkeypatch.setattr(settings, "SCORE_THRESHOLD", 0.0)
+    monkeypatch.setattr(settings, "QDRANT_QUANTIZATION", "none")
+
+    setup = QdrantSetup()
+    setup._client = QdrantClient(":memory:")
+    setup.create_collection()
+    setup.add_textbook_chunks([
+        {"chapter_id": "chapter-1", "text": "sensors", "vector": [1.0, 0.0, 0.0, 0.0], "position": 0},
+        {"chapter_id": "chapter-1", "text": "actuators", "vector": [0.0, 1.0, 0.0, 0.0], "position": 1},
+        {"chapter_id": "chapter-2", "text": "control", "vector": [0.0, 0.0, 1.0, 0.0], "position": 0},
+    ])
+    return setup
+
+
+def test_search_batch_returns_hits_per_query(qdrant):
+    results = qdrant.search_batch([[1.0, 0.1, 0.0, 0.0], [0.0, 0.1, 1.0, 0.0]], limit=2)
+
+    assert len(results) == 2
+    assert [len(hits) for hits in results] == [2, 2]
+    assert results[0][0]["text"] == "sensors"
+    assert results[1][0]["text"] == "control"
+    assert results[1][0]["chapter_id"] == "chapter-2"
+
+
+def test_search_batch_matches_single_search(qdrant):
+    query_vectors = [[0.2, 1.0, 0.0, 0.0], [1.0, 0.0, 0.3, 0.0]]
+
+    batch = qdrant.search_batch(query_vectors, limit=3)
+    single = [qdrant.search_chunks(query_vector, limit=3) for query_vector in query_vectors]
+
+    assert [[hit["id"] for hit in hits] for hits in batch] == [[hit["id"] for hit in hits] for hits in single]
+
+
+def test_search_batch_without_queries(qdrant):
+    assert qdrant.search_batch([]) == []